@@ -5,7 +5,7 @@ from autogpt.chat import chat_with_ai, create_chat_message
 from autogpt.config import Config
 from autogpt.json_utils.json_fix_llm import fix_json_using_multiple_techniques
 from autogpt.json_utils.utilities import validate_json
-from autogpt.logs import logger, print_assistant_thoughts
+from autogpt.logs import StreamedThoughtsPrinter, logger, print_assistant_thoughts
 from autogpt.speech import say_text
 from autogpt.spinner import Spinner
 from autogpt.utils import clean_input
@@ -82,7 +82,13 @@ class Agent:
                 break
 
             # Send message to AI, get response
-            with Spinner("Thinking... "):
+            with Spinner("Thinking... ") as spinner:
+                thoughts_printer = None
+                if cfg.stream_chat_completions:
+                    # Print the thoughts as they arrive instead of after the reply
+                    thoughts_printer = StreamedThoughtsPrinter(
+                        self.ai_name, on_first_output=spinner.stop
+                    )
                 assistant_reply = chat_with_ai(
                     self,
                     self.system_prompt,
@@ -90,8 +96,14 @@ class Agent:
                     self.full_message_history,
                     self.memory,
                     cfg.fast_token_limit,
+                    on_token=thoughts_printer.feed if thoughts_printer else None,
+                    on_stream_start=thoughts_printer.reset
+                    if thoughts_printer
+                    else None,
                 )  # TODO: This hardcodes the model to use GPT3.5. Make this an argument
 
+            # The streamed thoughts are only displayed: the reply returned has
+            # been through the plugins' on_response hooks
             assistant_reply_json = fix_json_using_multiple_techniques(assistant_reply)
             for plugin in cfg.plugins:
                 if not plugin.can_handle_post_planning():
@@ -103,7 +115,10 @@ class Agent:
                 validate_json(assistant_reply_json, "llm_response_format_1")
                 # Get command name and arguments
                 try:
-                    print_assistant_thoughts(self.ai_name, assistant_reply_json)
+                    if thoughts_printer is not None:
+                        thoughts_printer.finish(assistant_reply_json)
+                    else:
+                        print_assistant_thoughts(self.ai_name, assistant_reply_json)
                     command_name, arguments = get_command(assistant_reply_json)
                     if cfg.speak_mode:
                         say_text(f"I want to execute {command_name}")
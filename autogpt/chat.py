@@ -1,15 +1,21 @@
+import bisect
 import time
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 from openai.error import RateLimitError
 
 from autogpt import token_counter
 from autogpt.config import Config
-from autogpt.llm_utils import create_chat_completion
+from autogpt.llm_utils import create_chat_completion, get_embedding_cache
 from autogpt.logs import logger
 from autogpt.types.openai import Message
 
 cfg = Config()
 
+# Tokens added once per request by count_message_tokens, after the messages
+REPLY_PRIMING_TOKENS = 3
+
 
 def create_chat_message(role, content) -> Message:
     """
@@ -41,7 +47,7 @@ def generate_context(prompt, relevant_memory, full_message_history, model):
     next_message_to_add_index = len(full_message_history) - 1
     insertion_index = len(current_context)
     # Count the currently used tokens
-    current_tokens_used = token_counter.count_message_tokens(current_context, model)
+    current_tokens_used = count_context_tokens(current_context, model)
     return (
         next_message_to_add_index,
         current_tokens_used,
@@ -50,9 +56,103 @@ def generate_context(prompt, relevant_memory, full_message_history, model):
     )
 
 
+@lru_cache(maxsize=4096)
+def _message_tokens(message_items: Tuple[Tuple[str, str], ...], model: str) -> int:
+    return token_counter.count_message_tokens([dict(message_items)], model)
+
+
+def count_message_tokens_cached(message: Message, model: str) -> int:
+    """The tokens used by a message on its own, tokenized once per content"""
+    return _message_tokens(tuple(message.items()), model)
+
+
+def count_context_tokens(messages: List[Message], model: str) -> int:
+    """Like token_counter.count_message_tokens, tokenizing each message once"""
+    if not messages:
+        return token_counter.count_message_tokens([], model)
+    # Each message counted on its own includes the tokens priming the reply
+    return sum(count_message_tokens_cached(m, model) for m in messages) - (
+        REPLY_PRIMING_TOKENS * (len(messages) - 1)
+    )
+
+
+class HistoryTokens:
+    """Running token totals of a message history that only grows at its end
+
+    The totals are extended with the messages appended since the last update;
+    they are recomputed if the history was replaced or shortened.
+    """
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+        self.messages: List[Message] = []
+        # prefix[i] is the number of tokens used by the first i messages
+        self.prefix = [0]
+
+    def update(self, history: List[Message]) -> None:
+        count = len(self.messages)
+        if len(history) < count or (
+            count and history[count - 1] is not self.messages[-1]
+        ):
+            self.messages, self.prefix = [], [0]
+        for message in history[len(self.messages) :]:
+            self.messages.append(message)
+            self.prefix.append(
+                self.prefix[-1] + count_message_tokens_cached(message, self.model)
+            )
+
+    def fit(self, budget: int) -> int:
+        """The index of the oldest message from which the rest fit within budget"""
+        index = bisect.bisect_left(self.prefix, self.prefix[-1] - budget)
+        return min(index, len(self.messages))
+
+    def total(self, start: int) -> int:
+        """The tokens used by the messages from index start onwards"""
+        return self.prefix[-1] - self.prefix[start]
+
+
+_history_tokens: Dict[str, HistoryTokens] = {}
+
+
+def get_history_tokens(model: str) -> HistoryTokens:
+    """The running token totals of the agent's message history for a model"""
+    if model not in _history_tokens:
+        _history_tokens[model] = HistoryTokens(model)
+    return _history_tokens[model]
+
+
+def fit_relevant_memory(prompt, relevant_memory, model, max_tokens):
+    """The longest prefix of relevant_memory keeping the context within max_tokens
+
+    The number of memories to keep is found by bisection instead of dropping
+    one memory at a time.
+    """
+
+    def context_tokens(kept):
+        return generate_context(prompt, kept, [], model)[1]
+
+    if context_tokens(relevant_memory) <= max_tokens:
+        return relevant_memory
+    low, high = 0, len(relevant_memory) - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if context_tokens(relevant_memory[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return relevant_memory[:low]
+
+
 # TODO: Change debug from hardcode to argument
 def chat_with_ai(
-    agent, prompt, user_input, full_message_history, permanent_memory, token_limit
+    agent,
+    prompt,
+    user_input,
+    full_message_history,
+    permanent_memory,
+    token_limit,
+    on_token=None,
+    on_stream_start=None,
 ):
     """Interact with the OpenAI API, sending the prompt, user input, message history,
     and permanent memory."""
@@ -70,6 +170,10 @@ def chat_with_ai(
                 permanent_memory (Obj): The memory object containing the permanent
                   memory.
                 token_limit (int): The maximum number of tokens allowed in the API call.
+                on_token (Callable, optional): Streams the reply to this callback,
+                    see create_chat_completion.
+                on_stream_start (Callable, optional): Called before each attempt
+                    to stream the reply, see create_chat_completion.
 
             Returns:
             str: The AI's response.
@@ -87,7 +191,11 @@ def chat_with_ai(
             )
 
             logger.debug(f"Memory Stats: {permanent_memory.get_stats()}")
+            embedding_cache = get_embedding_cache()
+            if embedding_cache is not None:
+                logger.debug(f"Embedding Cache Stats: {embedding_cache.stats()}")
 
+            relevant_memory = fit_relevant_memory(prompt, relevant_memory, model, 2500)
             (
                 next_message_to_add_index,
                 current_tokens_used,
@@ -95,7 +203,7 @@ def chat_with_ai(
                 current_context,
             ) = generate_context(prompt, relevant_memory, full_message_history, model)
 
-            while current_tokens_used > 2500:
+            while current_tokens_used > 2500 and relevant_memory:
                 # remove memories until we are under 2500 tokens
                 relevant_memory = relevant_memory[:-1]
                 (
@@ -111,27 +219,16 @@ def chat_with_ai(
                 [create_chat_message("user", user_input)], model
             )  # Account for user input (appended later)
 
-            while next_message_to_add_index >= 0:
-                # print (f"CURRENT TOKENS USED: {current_tokens_used}")
-                message_to_add = full_message_history[next_message_to_add_index]
-
-                tokens_to_add = token_counter.count_message_tokens(
-                    [message_to_add], model
-                )
-                if current_tokens_used + tokens_to_add > send_token_limit:
-                    break
-
-                # Add the most recent message to the start of the current context,
-                #  after the two system prompts.
-                current_context.insert(
-                    insertion_index, full_message_history[next_message_to_add_index]
-                )
-
-                # Count the currently used tokens
-                current_tokens_used += tokens_to_add
-
-                # Move to the next most recent message in the full message history
-                next_message_to_add_index -= 1
+            # Add the most recent messages that fit, after the system prompts
+            history_tokens = get_history_tokens(model)
+            history_tokens.update(full_message_history)
+            first_message_index = history_tokens.fit(
+                send_token_limit - current_tokens_used
+            )
+            current_context[insertion_index:insertion_index] = full_message_history[
+                first_message_index:
+            ]
+            current_tokens_used += history_tokens.total(first_message_index)
 
             # Append user input, the length of this is accounted for above
             current_context.extend([create_chat_message("user", user_input)])
@@ -180,6 +277,8 @@ def chat_with_ai(
                 model=model,
                 messages=current_context,
                 max_tokens=tokens_remaining,
+                on_token=on_token,
+                on_stream_start=on_stream_start,
             )
 
             # Update full message history
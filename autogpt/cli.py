@@ -139,6 +139,7 @@ def main(
         command_registry.import_commands("autogpt.commands.image_gen")
         command_registry.import_commands("autogpt.commands.improve_code")
         command_registry.import_commands("autogpt.commands.twitter")
+        command_registry.import_commands("autogpt.commands.web_requests")
         command_registry.import_commands("autogpt.commands.web_selenium")
         command_registry.import_commands("autogpt.commands.write_tests")
         command_registry.import_commands("autogpt.app")
@@ -1,15 +1,165 @@
 """Web scraping commands using Playwright"""
 from __future__ import annotations
 
+import atexit
+import threading
+import time
+from collections import OrderedDict
+
 try:
-    from playwright.sync_api import sync_playwright
+    from playwright.sync_api import BrowserContext
+    from playwright.sync_api import Page as PlaywrightPage
+    from playwright.sync_api import Route, sync_playwright
 except ImportError:
     print(
         "Playwright not installed. Please install it with 'pip install playwright' to use."
     )
-from bs4 import BeautifulSoup
 
-from autogpt.processing.html import extract_hyperlinks, format_hyperlinks
+from autogpt.logs import logger
+from autogpt.processing.html import Page, extract_page, format_hyperlinks
+
+# Requests for these resources are aborted, the text of a page does not need them
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+# How many pages a browser context loads before it is replaced by a fresh one
+PAGES_PER_CONTEXT = 20
+# How many loaded pages are kept, and for how many seconds, so that scraping
+# the text and then the links of a page navigates to it once
+PAGE_CACHE_SIZE = 8
+PAGE_CACHE_TTL = 60
+
+_local = threading.local()
+# The open browsers of every thread
+_browsers: set[PlaywrightBrowser] = set()
+_browsers_lock = threading.Lock()
+
+
+class PlaywrightBrowser:
+    """A Chromium browser kept open between pages
+
+    Pages are opened in a browser context that is reused for PAGES_PER_CONTEXT
+    pages, with requests for images, fonts and media aborted. The sync API of
+    Playwright can only be used from the thread that started it, so each
+    thread gets its own browser from get_browser, and must close it with
+    close_browser.
+    """
+
+    def __init__(self) -> None:
+        self.thread_name = threading.current_thread().name
+        self._playwright = sync_playwright().start()
+        try:
+            self._browser = self._playwright.chromium.launch()
+        except BaseException:
+            self._playwright.stop()
+            raise
+        self._context: BrowserContext | None = None
+        self._context_pages = 0
+        self._pages: OrderedDict[str, tuple[float, Page]] = OrderedDict()
+
+    def load(self, url: str) -> Page:
+        """Navigate to a URL and extract its text and hyperlinks
+
+        Args:
+            url (str): The URL of the page
+
+        Returns:
+            Page: The text and hyperlinks of the page
+        """
+        now = time.monotonic()
+        if url in self._pages:
+            loaded_at, page = self._pages.pop(url)
+            if now - loaded_at < PAGE_CACHE_TTL:
+                self._pages[url] = (loaded_at, page)
+                return page
+
+        browser_page = self._new_page()
+        try:
+            browser_page.goto(url)
+            html_content = browser_page.content()
+        finally:
+            browser_page.close()
+
+        page = extract_page(html_content, url)
+        self._pages[url] = (now, page)
+        if len(self._pages) > PAGE_CACHE_SIZE:
+            self._pages.popitem(last=False)
+        return page
+
+    def _new_page(self) -> PlaywrightPage:
+        if self._context is None or self._context_pages >= PAGES_PER_CONTEXT:
+            if self._context is not None:
+                self._context.close()
+            self._context = self._browser.new_context()
+            self._context.route("**/*", block_heavy_resources)
+            self._context_pages = 0
+        self._context_pages += 1
+        return self._context.new_page()
+
+    def is_connected(self) -> bool:
+        """Whether the browser is still running"""
+        return self._browser.is_connected()
+
+    def close(self) -> None:
+        """Close the browser and stop Playwright"""
+        for close in (self._browser.close, self._playwright.stop):
+            try:
+                close()
+            except Exception as e:
+                logger.warn(f"Could not close the Playwright browser: {e}")
+
+
+def block_heavy_resources(route: Route) -> None:
+    """Abort the requests for images, fonts and media, continue the others
+
+    Args:
+        route (Route): The intercepted request
+    """
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+def get_browser() -> PlaywrightBrowser:
+    """The browser of the current thread, launched on first use or if it crashed"""
+    browser = getattr(_local, "browser", None)
+    if browser is None or not browser.is_connected():
+        if browser is not None:
+            with _browsers_lock:
+                _browsers.discard(browser)
+            browser.close()
+        browser = _local.browser = PlaywrightBrowser()
+        with _browsers_lock:
+            _browsers.add(browser)
+    return browser
+
+
+def close_browser() -> None:
+    """Close the browser of the current thread, if it launched one
+
+    The browser of the main thread is closed when the program exits. Other
+    threads must call this once they are done scraping, as the sync API of
+    Playwright cannot close their browser from another thread.
+    """
+    browser = getattr(_local, "browser", None)
+    if browser is not None:
+        _local.browser = None
+        with _browsers_lock:
+            _browsers.discard(browser)
+        browser.close()
+
+
+def _close_browsers_at_exit() -> None:
+    close_browser()
+    with _browsers_lock:
+        unclosed = list(_browsers)
+    for browser in unclosed:
+        logger.warn(
+            f"The Playwright browser of thread {browser.thread_name} was not"
+            " closed, it exits with the program"
+        )
+
+
+atexit.register(_close_browsers_at_exit)
 
 
 def scrape_text(url: str) -> str:
@@ -21,28 +171,11 @@ def scrape_text(url: str) -> str:
     Returns:
         str: The scraped text
     """
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
-
-        try:
-            page.goto(url)
-            html_content = page.content()
-            soup = BeautifulSoup(html_content, "html.parser")
-
-            for script in soup(["script", "style"]):
-                script.extract()
-
-            text = soup.get_text()
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = "\n".join(chunk for chunk in chunks if chunk)
-
-        except Exception as e:
-            text = f"Error: {str(e)}"
+    try:
+        text = get_browser().load(url).text
 
-        finally:
-            browser.close()
+    except Exception as e:
+        text = f"Error: {str(e)}"
 
     return text
 
@@ -56,25 +189,11 @@ def scrape_links(url: str) -> str | list[str]:
     Returns:
         Union[str, List[str]]: The scraped links
     """
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
-
-        try:
-            page.goto(url)
-            html_content = page.content()
-            soup = BeautifulSoup(html_content, "html.parser")
-
-            for script in soup(["script", "style"]):
-                script.extract()
+    try:
+        hyperlinks = get_browser().load(url).hyperlinks
+        formatted_links = format_hyperlinks(hyperlinks)
 
-            hyperlinks = extract_hyperlinks(soup, url)
-            formatted_links = format_hyperlinks(hyperlinks)
-
-        except Exception as e:
-            formatted_links = f"Error: {str(e)}"
-
-        finally:
-            browser.close()
+    except Exception as e:
+        formatted_links = f"Error: {str(e)}"
 
     return formatted_links
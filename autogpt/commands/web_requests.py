@@ -1,16 +1,22 @@
 """Browse a webpage and summarize it using the LLM model"""
 from __future__ import annotations
 
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from urllib.parse import urljoin, urlparse
 
 import requests
-from bs4 import BeautifulSoup
 from requests import Response
 from requests.compat import urljoin
 
+from autogpt.commands.command import command
 from autogpt.config import Config
+from autogpt.disk_cache import DiskCache
+from autogpt.http_cache import HTTPCache
 from autogpt.memory import get_memory
-from autogpt.processing.html import extract_hyperlinks, format_hyperlinks
+from autogpt.processing.html import Page, extract_page, format_hyperlinks
 
 CFG = Config()
 memory = get_memory(CFG)
@@ -18,6 +24,35 @@ memory = get_memory(CFG)
 session = requests.Session()
 session.headers.update({"User-Agent": CFG.user_agent})
 
+# How many extracted pages are kept, and for how many seconds, so that
+# scraping the text and then the links of a page fetches it once
+PAGE_CACHE_SIZE = 8
+PAGE_CACHE_TTL = 60
+_http_cache: HTTPCache | None = None
+_pages: OrderedDict[str, tuple[float, Page]] = OrderedDict()
+_pages_lock = threading.Lock()
+
+# The size of the chunks streamed bodies are read in
+CHUNK_SIZE = 64 * 1024
+# Content types the scrapers can read, besides text/*, */*+xml and */*+json
+TEXT_CONTENT_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/xml",
+}
+# Content types that say nothing about the body, which is then sniffed
+UNKNOWN_CONTENT_TYPES = {"", "application/octet-stream", "binary/octet-stream"}
+# The first bytes of common binary files served without a content type
+BINARY_SIGNATURES = (
+    b"%PDF-",
+    b"\x89PNG",
+    b"GIF8",
+    b"\xff\xd8\xff",
+    b"PK\x03\x04",
+    b"\x1f\x8b",
+    b"\x7fELF",
+)
+
 
 def is_valid_url(url: str) -> bool:
     """Check if the URL is valid
@@ -111,7 +146,11 @@ def get_response(
 
         sanitized_url = sanitize_url(url)
 
-        response = session.get(sanitized_url, timeout=timeout)
+        http_cache = get_http_cache()
+        if http_cache is not None:
+            response = http_cache.get(session, sanitized_url, timeout, **STREAMED_TEXT)
+        else:
+            response = session.get(sanitized_url, timeout=timeout, **STREAMED_TEXT)
 
         # Check if the response contains an HTTP error
         if response.status_code >= 400:
@@ -128,6 +167,147 @@ def get_response(
         return None, f"Error: {str(re)}"
 
 
+def read_text_body(response: Response, *args, **kwargs) -> Response:
+    """Read at most CFG.http_max_bytes of the body of a streamed response
+
+    The browsing requests are streamed with this response hook, so a huge page
+    is truncated as it is downloaded and a binary file is rejected from its
+    headers or first bytes, before its body is downloaded.
+
+    Args:
+        response (Response): The streamed response
+
+    Returns:
+        Response: The response, with its body read and the connection released
+
+    Raises:
+        ValueError: If the response is not text
+    """
+    content_type = (
+        response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    )
+    # Only successful responses must be text, not redirects and error pages
+    check_type = response.ok and not response.is_redirect
+    if check_type and not is_text_content_type(content_type):
+        response.close()
+        raise ValueError(f"Unsupported content type {content_type}")
+
+    sniff = check_type and content_type in UNKNOWN_CONTENT_TYPES
+    try:
+        content = read_capped(response, CFG.http_max_bytes, sniff)
+    finally:
+        response.close()
+    # Store the body the way Response.content does once it has read it
+    response._content = content
+    response._content_consumed = True
+    return response
+
+
+# The options of the browsing requests, whose text bodies are read while
+# they are downloaded
+STREAMED_TEXT = {"stream": True, "hooks": {"response": read_text_body}}
+
+
+def read_capped(response: Response, max_bytes: int, sniff: bool = False) -> bytes:
+    """Read the body of a streamed response, up to a number of bytes
+
+    Args:
+        response (Response): The streamed response
+        max_bytes (int): The number of bytes the body is truncated to
+        sniff (bool): Whether to reject a body starting like a binary file
+
+    Returns:
+        bytes: The body, truncated to max_bytes
+
+    Raises:
+        ValueError: If sniff is set and the body is binary
+    """
+    body = bytearray()
+    for chunk in response.iter_content(CHUNK_SIZE):
+        if sniff and not body and is_binary(chunk):
+            raise ValueError("Unsupported content type: binary data")
+        body += chunk[: max_bytes - len(body)]
+        if len(body) >= max_bytes:
+            break
+    return bytes(body)
+
+
+def is_text_content_type(content_type: str) -> bool:
+    """Check if a content type is text, or unknown
+
+    Args:
+        content_type (str): The lowercase media type, without parameters
+
+    Returns:
+        bool: True if the scrapers can read a body of this content type
+    """
+    return (
+        content_type in UNKNOWN_CONTENT_TYPES
+        or content_type in TEXT_CONTENT_TYPES
+        or content_type.startswith("text/")
+        or content_type.endswith(("+xml", "+json"))
+    )
+
+
+def is_binary(data: bytes) -> bool:
+    """Check if the first bytes of a body are those of a binary file
+
+    Args:
+        data (bytes): The first bytes of the body
+
+    Returns:
+        bool: True if the body starts like a common binary file or holds NUL bytes
+    """
+    return data.startswith(BINARY_SIGNATURES) or b"\x00" in data[:1024]
+
+
+def get_http_cache() -> HTTPCache | None:
+    """The cache of fetched pages, if HTTP_CACHE is on"""
+    global _http_cache
+    if _http_cache is None and CFG.http_cache:
+        _http_cache = HTTPCache(
+            DiskCache(CFG.http_cache_file, CFG.http_cache_size_mb * 2**20),
+            CFG.http_cache_default_ttl,
+        )
+    return _http_cache
+
+
+def get_page(url: str) -> tuple[None, str] | tuple[Page, None]:
+    """Get the text and hyperlinks of a webpage
+
+    The pages extracted in the last PAGE_CACHE_TTL seconds are shared by the
+    scrapers, so scraping the text and then the links of a page fetches and
+    parses it once. The returned page must not be modified.
+
+    Args:
+        url (str): The URL of the webpage
+
+    Returns:
+        tuple[None, str] | tuple[Page, None]: The page and error message
+    """
+    now = time.monotonic()
+    with _pages_lock:
+        if url in _pages:
+            loaded_at, page = _pages.pop(url)
+            if now - loaded_at < PAGE_CACHE_TTL:
+                _pages[url] = (loaded_at, page)
+                return page, None
+
+    response, error_message = get_response(url)
+    if error_message:
+        return None, error_message
+    if not response:
+        return None, "Error: Could not get response"
+
+    page = extract_page(response.text, url)
+
+    with _pages_lock:
+        _pages[url] = (now, page)
+        if len(_pages) > PAGE_CACHE_SIZE:
+            _pages.popitem(last=False)
+    return page, None
+
+
 def scrape_text(url: str) -> str:
     """Scrape text from a webpage
 
@@ -137,23 +317,78 @@ def scrape_text(url: str) -> str:
     Returns:
         str: The scraped text
     """
-    response, error_message = get_response(url)
+    page, error_message = get_page(url)
     if error_message:
         return error_message
-    if not response:
-        return "Error: Could not get response"
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    return page.text
+
+
+@command(
+    "scrape_many",
+    "Scrape Text From Several Websites",
+    '"urls": "<list_of_urls>"',
+)
+def scrape_many(
+    urls: str | list[str],
+    max_workers: int = 8,
+    max_per_host: int = 2,
+    timeout: float = 30,
+    max_bytes: int = 32000,
+) -> str:
+    """Scrape the text of several webpages concurrently
 
-    for script in soup(["script", "style"]):
-        script.extract()
+    Args:
+        urls (str | list[str]): The URLs to scrape, as a list or separated by
+            commas or whitespace
+        max_workers (int): How many pages to fetch at the same time
+        max_per_host (int): How many pages of the same host to fetch at the
+            same time
+        timeout (float): Seconds to wait for all the pages; pages not scraped
+            by then are reported as timed out
+        max_bytes (int): The total size of the text returned, in UTF-8 bytes;
+            the text of the pages is truncated past it
 
-    text = soup.get_text()
-    lines = (line.strip() for line in text.splitlines())
-    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-    text = "\n".join(chunk for chunk in chunks if chunk)
+    Returns:
+        str: The text of each page, or its error message
+    """
+    if isinstance(urls, str):
+        urls = urls.replace(",", " ").split()
+    urls = list(dict.fromkeys(url.strip() for url in urls if url.strip()))
+    if not urls:
+        return "Error: No URLs to scrape"
+
+    host_limits = {
+        host: threading.Semaphore(max_per_host)
+        for host in {urlparse(url).netloc for url in urls}
+    }
 
-    return text
+    def scrape(url: str) -> str:
+        with host_limits[urlparse(url).netloc]:
+            return scrape_text(url)
+
+    executor = ThreadPoolExecutor(max_workers=max(max_workers, 1))
+    futures = [executor.submit(scrape, url) for url in urls]
+    wait(futures, timeout=timeout)
+    # Pages still loading are abandoned rather than waited for
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results = []
+    remaining_bytes = max_bytes
+    for url, future in zip(urls, futures):
+        if not future.done() or future.cancelled():
+            text = f"Error: Timed out after {timeout} seconds"
+        elif future.exception() is not None:
+            text = f"Error: {future.exception()}"
+        else:
+            text = future.result()
+        encoded = text.encode("utf-8")
+        if len(encoded) > remaining_bytes:
+            text = encoded[:remaining_bytes].decode("utf-8", errors="ignore")
+            text += "\n[Truncated: the size limit of the results was reached]"
+        remaining_bytes = max(remaining_bytes - len(encoded), 0)
+        results.append(f"Text from {url}:\n{text}")
+    return "\n\n".join(results)
 
 
 def scrape_links(url: str) -> str | list[str]:
@@ -165,19 +400,11 @@ def scrape_links(url: str) -> str | list[str]:
     Returns:
        str | list[str]: The scraped links
     """
-    response, error_message = get_response(url)
+    page, error_message = get_page(url)
     if error_message:
         return error_message
-    if not response:
-        return "Error: Could not get response"
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    for script in soup(["script", "style"]):
-        script.extract()
-
-    hyperlinks = extract_hyperlinks(soup, url)
 
-    return format_hyperlinks(hyperlinks)
+    return format_hyperlinks(page.hyperlinks)
 
 
 def create_message(chunk, question):
@@ -1,12 +1,21 @@
 """Selenium web scraping module."""
 from __future__ import annotations
 
+import atexit
 import logging
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from sys import platform
+from typing import Callable, Iterator, Optional
 
-from bs4 import BeautifulSoup
 from selenium import webdriver
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    NoSuchWindowException,
+    WebDriverException,
+)
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.common.by import By
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
@@ -20,10 +29,11 @@ from webdriver_manager.firefox import GeckoDriverManager
 import autogpt.processing.text as summary
 from autogpt.commands.command import command
 from autogpt.config import Config
-from autogpt.processing.html import extract_hyperlinks, format_hyperlinks
+from autogpt.processing.html import extract_page, format_hyperlinks
 
 FILE_DIR = Path(__file__).parent.parent
 CFG = Config()
+_driver_pool: Optional[DriverPool] = None
 
 
 @command(
@@ -34,6 +44,8 @@ CFG = Config()
 def browse_website(url: str, question: str) -> tuple[str, WebDriver]:
     """Browse a website and return the answer and links to the user
 
+    The page is loaded in a browser borrowed from the shared driver pool.
+
     Args:
         url (str): The url of the website to browse
         question (str): The question asked by the user
@@ -41,27 +53,51 @@ def browse_website(url: str, question: str) -> tuple[str, WebDriver]:
     Returns:
         Tuple[str, WebDriver]: The answer and links to the user and the webdriver
     """
-    driver, text = scrape_text_with_selenium(url)
-    add_header(driver)
-    summary_text = summary.summarize_text(url, text, question, driver)
-    links = scrape_links_with_selenium(driver, url)
+    with get_driver_pool().driver() as driver:
+        driver, text = scrape_text_with_selenium(url, driver)
+        add_header(driver)
+        summary_text = summary.summarize_text(url, text, question, driver)
+        links = scrape_links_with_selenium(driver, url)
 
     # Limit links to 5
     if len(links) > 5:
         links = links[:5]
-    close_browser(driver)
     return f"Answer gathered from website: {summary_text} \n \n Links: {links}", driver
 
 
-def scrape_text_with_selenium(url: str) -> tuple[WebDriver, str]:
+def scrape_text_with_selenium(
+    url: str, driver: Optional[WebDriver] = None
+) -> tuple[WebDriver, str]:
     """Scrape text from a website using selenium
 
     Args:
         url (str): The url of the website to scrape
+        driver (WebDriver, optional): The webdriver to load the page in.
+            Defaults to a new one.
 
     Returns:
         Tuple[WebDriver, str]: The webdriver and the text scraped from the website
     """
+    if driver is None:
+        driver = create_driver()
+    driver.get(url)
+
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.TAG_NAME, "body"))
+    )
+
+    # Get the HTML content directly from the browser's DOM
+    page_source = driver.execute_script("return document.body.outerHTML;")
+    text = extract_page(page_source, url).text
+    return driver, text
+
+
+def create_driver() -> WebDriver:
+    """Launch the browser set in the config
+
+    Returns:
+        WebDriver: The webdriver of the new browser
+    """
     logging.getLogger("selenium").setLevel(logging.CRITICAL)
 
     options_available = {
@@ -77,7 +113,7 @@ def scrape_text_with_selenium(url: str) -> tuple[WebDriver, str]:
 
     if CFG.selenium_web_browser == "firefox":
         driver = webdriver.Firefox(
-            executable_path=GeckoDriverManager().install(), options=options
+            executable_path=driver_executable_path("firefox"), options=options
         )
     elif CFG.selenium_web_browser == "safari":
         # Requires a bit more setup on the users end
@@ -86,7 +122,8 @@ def scrape_text_with_selenium(url: str) -> tuple[WebDriver, str]:
     else:
         if platform == "linux" or platform == "linux2":
             options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--remote-debugging-port=9222")
+            # Let each pooled browser pick a free port
+            options.add_argument("--remote-debugging-port=0")
 
         options.add_argument("--no-sandbox")
         if CFG.selenium_headless:
@@ -94,26 +131,172 @@ def scrape_text_with_selenium(url: str) -> tuple[WebDriver, str]:
             options.add_argument("--disable-gpu")
 
         driver = webdriver.Chrome(
-            executable_path=ChromeDriverManager().install(), options=options
+            executable_path=driver_executable_path("chrome"), options=options
         )
-    driver.get(url)
+    return driver
 
-    WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.TAG_NAME, "body"))
+
+@lru_cache(maxsize=None)
+def driver_executable_path(browser: str) -> str:
+    """Download the driver of a browser once, returning the path of its binary
+
+    Args:
+        browser (str): chrome or firefox
+
+    Returns:
+        str: The path of the driver's executable
+    """
+    if browser == "firefox":
+        return GeckoDriverManager().install()
+    return ChromeDriverManager().install()
+
+
+def is_session_lost(error: WebDriverException) -> bool:
+    """Check if a WebDriver error means the browser session is gone
+
+    Errors about a page, like a page load timeout, leave the browser usable.
+    WebDriverException itself is raised when the browser cannot be reached.
+
+    Args:
+        error (WebDriverException): The error raised while using the browser
+
+    Returns:
+        bool: True if the browser must be replaced
+    """
+    return type(error) is WebDriverException or isinstance(
+        error, (InvalidSessionIdException, NoSuchWindowException)
     )
 
-    # Get the HTML content directly from the browser's DOM
-    page_source = driver.execute_script("return document.body.outerHTML;")
-    soup = BeautifulSoup(page_source, "html.parser")
 
-    for script in soup(["script", "style"]):
-        script.extract()
+def reset_driver(driver: WebDriver) -> None:
+    """Clear the state a page left in a browser before it is reused
 
-    text = soup.get_text()
-    lines = (line.strip() for line in text.splitlines())
-    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-    text = "\n".join(chunk for chunk in chunks if chunk)
-    return driver, text
+    Args:
+        driver (WebDriver): The webdriver to reset
+    """
+    for handle in driver.window_handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(driver.window_handles[0])
+    driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    if hasattr(driver, "execute_cdp_cmd"):
+        # delete_all_cookies only clears the cookies of the current domain
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    driver.delete_all_cookies()
+    driver.get("about:blank")
+
+
+class DriverPool:
+    """A pool of warm browsers shared by the browsing commands
+
+    Up to `size` browsers are kept open between pages. A browser is reset
+    after each use, and quit after `max_pages` pages or if using it raised an
+    error meaning its session is lost, so that a crashed browser is replaced
+    by a new one.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_pages: int,
+        factory: Callable[[], WebDriver] = create_driver,
+    ) -> None:
+        self.size = max(size, 1)
+        self.max_pages = max_pages
+        self.factory = factory
+        self._idle: list[tuple[WebDriver, int]] = []
+        self._in_use = 0
+        self._condition = threading.Condition()
+        self._stats = {"created": 0, "reused": 0, "recycled": 0, "crashed": 0}
+
+    @contextmanager
+    def driver(self) -> Iterator[WebDriver]:
+        """Borrow a browser, waiting for one if all of them are in use"""
+        with self._condition:
+            while not self._idle and self._in_use >= self.size:
+                self._condition.wait()
+            self._in_use += 1
+            entry = self._idle.pop() if self._idle else None
+        try:
+            if entry is None:
+                entry = (self.factory(), 0)
+                self._count("created")
+            else:
+                self._count("reused")
+        except BaseException:
+            self._release(None)
+            raise
+
+        driver, pages = entry
+        crashed = False
+        try:
+            yield driver
+        except WebDriverException as e:
+            crashed = is_session_lost(e)
+            raise
+        finally:
+            if crashed:
+                self._count("crashed")
+                self._quit(driver)
+                self._release(None)
+            else:
+                self._release(self._reset(driver, pages + 1))
+
+    def _reset(self, driver: WebDriver, pages: int) -> Optional[tuple[WebDriver, int]]:
+        """The browser ready for its next page, or None if it was quit"""
+        if pages >= self.max_pages:
+            self._count("recycled")
+            self._quit(driver)
+            return None
+        try:
+            reset_driver(driver)
+        except WebDriverException:
+            self._count("crashed")
+            self._quit(driver)
+            return None
+        return driver, pages
+
+    def _release(self, entry: Optional[tuple[WebDriver, int]]) -> None:
+        with self._condition:
+            self._in_use -= 1
+            if entry is not None:
+                self._idle.append(entry)
+            self._condition.notify()
+
+    def _count(self, event: str) -> None:
+        with self._condition:
+            self._stats[event] += 1
+
+    @staticmethod
+    def _quit(driver: WebDriver) -> None:
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def stats(self) -> dict[str, int]:
+        """Counts of the browsers created, reused, recycled and crashed, and of
+        those idle and in use right now"""
+        with self._condition:
+            return dict(self._stats, idle=len(self._idle), in_use=self._in_use)
+
+    def close(self) -> None:
+        """Quit the idle browsers"""
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for driver, _ in idle:
+            self._quit(driver)
+
+
+def get_driver_pool() -> DriverPool:
+    """The driver pool shared by the browsing commands, created on first use"""
+    global _driver_pool
+    if _driver_pool is None:
+        # Safari only allows one automated session at a time
+        size = 1 if CFG.selenium_web_browser == "safari" else CFG.selenium_pool_size
+        _driver_pool = DriverPool(size, CFG.selenium_max_pages_per_driver)
+        atexit.register(_driver_pool.close)
+    return _driver_pool
 
 
 def scrape_links_with_selenium(driver: WebDriver, url: str) -> list[str]:
@@ -126,18 +309,11 @@ def scrape_links_with_selenium(driver: WebDriver, url: str) -> list[str]:
         List[str]: The links scraped from the website
     """
     page_source = driver.page_source
-    soup = BeautifulSoup(page_source, "html.parser")
-
-    for script in soup(["script", "style"]):
-        script.extract()
-
-    hyperlinks = extract_hyperlinks(soup, url)
-
-    return format_hyperlinks(hyperlinks)
+    return format_hyperlinks(extract_page(page_source, url).hyperlinks)
 
 
 def close_browser(driver: WebDriver) -> None:
-    """Close the browser
+    """Close a browser that was not borrowed from the driver pool
 
     Args:
         driver (WebDriver): The webdriver to close
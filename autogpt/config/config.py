@@ -37,6 +37,25 @@ class Config(metaclass=Singleton):
         self.browse_spacy_language_model = os.getenv(
             "BROWSE_SPACY_LANGUAGE_MODEL", "en_core_web_sm"
         )
+        # How text and links are extracted from HTML: lxml or html.parser
+        self.html_extraction_backend = os.getenv("HTML_EXTRACTION_BACKEND", "lxml")
+        # How scraped text is split into sentences: spacy or regex
+        self.browse_sentence_splitter = os.getenv("BROWSE_SENTENCE_SPLITTER", "spacy")
+        # How many chunks of a page are summarized at the same time
+        self.browse_summary_concurrency = int(
+            os.getenv("BROWSE_SUMMARY_CONCURRENCY", 8)
+        )
+        # Cache of the summaries of pages and chunks, keyed by their content
+        self.browse_summary_cache = os.getenv("BROWSE_SUMMARY_CACHE", "False") == "True"
+        self.browse_summary_cache_file = os.getenv(
+            "BROWSE_SUMMARY_CACHE_FILE", "summary_cache.sqlite3"
+        )
+        self.browse_summary_cache_ttl = int(
+            os.getenv("BROWSE_SUMMARY_CACHE_TTL", 604800)
+        )
+        self.browse_summary_cache_size_mb = int(
+            os.getenv("BROWSE_SUMMARY_CACHE_SIZE_MB", 64)
+        )
 
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.temperature = float(os.getenv("TEMPERATURE", "0"))
@@ -104,6 +123,11 @@ class Config(metaclass=Singleton):
         # Selenium browser settings
         self.selenium_web_browser = os.getenv("USE_WEB_BROWSER", "chrome")
         self.selenium_headless = os.getenv("HEADLESS_BROWSER", "True") == "True"
+        # Browsers kept open between pages, and pages loaded before restarting one
+        self.selenium_pool_size = int(os.getenv("BROWSER_POOL_SIZE", 1))
+        self.selenium_max_pages_per_driver = int(
+            os.getenv("BROWSER_MAX_PAGES_PER_DRIVER", 20)
+        )
 
         # User agent header to use when making HTTP requests
         # Some websites might just completely deny request with an error code if
@@ -113,6 +137,14 @@ class Config(metaclass=Singleton):
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_4) AppleWebKit/537.36"
             " (KHTML, like Gecko) Chrome/83.0.4103.97 Safari/537.36",
         )
+        # Bodies of fetched pages are truncated to this many bytes
+        self.http_max_bytes = int(os.getenv("HTTP_MAX_BYTES", 5242880))
+        # Opt-in disk cache of the pages fetched by the browsing commands
+        self.http_cache = os.getenv("HTTP_CACHE", "False") == "True"
+        self.http_cache_file = os.getenv("HTTP_CACHE_FILE", "http_cache.sqlite3")
+        self.http_cache_size_mb = int(os.getenv("HTTP_CACHE_SIZE_MB", 128))
+        # How long pages without caching headers are used without revalidation
+        self.http_cache_default_ttl = int(os.getenv("HTTP_CACHE_DEFAULT_TTL", 300))
 
         self.redis_host = os.getenv("REDIS_HOST", "localhost")
         self.redis_port = os.getenv("REDIS_PORT", "6379")
@@ -122,6 +154,41 @@ class Config(metaclass=Singleton):
         # Note that indexes must be created on db 0 in redis, this is not configurable.
 
         self.memory_backend = os.getenv("MEMORY_BACKEND", "local")
+        # How the local memory backend stores embeddings: float32, float16 or int8
+        self.local_memory_dtype = os.getenv("LOCAL_MEMORY_DTYPE", "float32")
+        # Inverted lists scanned per query by the local_ann memory backend
+        self.local_ann_nprobe = int(os.getenv("LOCAL_ANN_NPROBE", 16))
+        # Persistent embedding cache shared by all memory backends
+        self.embedding_cache = os.getenv("EMBEDDING_CACHE", "False") == "True"
+        self.embedding_cache_file = os.getenv(
+            "EMBEDDING_CACHE_FILE", "embedding_cache.sqlite3"
+        )
+        self.embedding_cache_size_mb = int(os.getenv("EMBEDDING_CACHE_SIZE_MB", 256))
+        # Embedding requests made within this window are sent as one batch
+        self.embedding_batch_window_ms = int(os.getenv("EMBEDDING_BATCH_WINDOW_MS", 0))
+        # Proactive rate limits shared by all OpenAI requests; 0 disables a limit
+        self.openai_requests_per_minute = int(
+            os.getenv("OPENAI_REQUESTS_PER_MINUTE", 0)
+        )
+        self.openai_tokens_per_minute = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", 0))
+        # Where the rate limiter keeps its state: memory, sqlite or redis
+        self.rate_limit_store = os.getenv("RATE_LIMIT_STORE", "memory")
+        self.rate_limit_store_file = os.getenv(
+            "RATE_LIMIT_STORE_FILE", "rate_limits.sqlite3"
+        )
+        # Stream the agent's replies to print its thoughts as they arrive
+        self.stream_chat_completions = (
+            os.getenv("STREAM_CHAT_COMPLETIONS", "False") == "True"
+        )
+        # Opt-in cache of chat completions requested at temperature 0
+        self.llm_response_cache = os.getenv("LLM_RESPONSE_CACHE", "False") == "True"
+        self.llm_response_cache_file = os.getenv(
+            "LLM_RESPONSE_CACHE_FILE", "llm_response_cache.sqlite3"
+        )
+        self.llm_response_cache_ttl = int(os.getenv("LLM_RESPONSE_CACHE_TTL", 604800))
+        self.llm_response_cache_size_mb = int(
+            os.getenv("LLM_RESPONSE_CACHE_SIZE_MB", 64)
+        )
         # Initialize the OpenAI API client
         openai.api_key = self.openai_api_key
 
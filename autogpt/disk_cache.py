@@ -0,0 +1,181 @@
+"""A small persistent key-value cache stored in SQLite"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from autogpt.logs import logger
+
+
+def cache_key(*parts: str) -> str:
+    """Hash the parts of a cache key into a fixed-size string"""
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """A size-bounded, least-recently-used cache of bytes values in SQLite.
+
+    Entries older than `ttl` seconds (if set) are treated as missing. Once the
+    stored values exceed `max_bytes`, the least recently read entries are
+    evicted. The cache is safe to share between threads, and between processes
+    through SQLite's own locking. The size of the stored values is kept up to
+    date by triggers, so it is never recomputed. If the database cannot be
+    opened, the cache stays empty, and if it is locked by another process for
+    too long, reads miss and writes are skipped, instead of failing callers.
+    """
+
+    def __init__(
+        self, filename: str, max_bytes: int, ttl: Optional[float] = None
+    ) -> None:
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        try:
+            self._cnx = sqlite3.connect(filename, check_same_thread=False)
+            self._cnx.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY,"
+                " value BLOB, size INTEGER, created REAL, accessed REAL)"
+            )
+            self._cnx.execute(
+                "CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)"
+            )
+            self._cnx.execute(
+                "CREATE TABLE IF NOT EXISTS cache_size"
+                " (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER)"
+            )
+            self._cnx.execute(
+                "INSERT OR IGNORE INTO cache_size"
+                " SELECT 0, COALESCE(SUM(size), 0) FROM cache"
+            )
+            self._cnx.execute(
+                "CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache"
+                " BEGIN UPDATE cache_size SET bytes = bytes + NEW.size; END"
+            )
+            self._cnx.execute(
+                "CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache"
+                " BEGIN UPDATE cache_size SET bytes = bytes - OLD.size; END"
+            )
+            self._cnx.commit()
+        except sqlite3.Error as e:
+            logger.warn(f"Cache '{filename}' is unavailable: {e}")
+            self._cnx = None
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a cached value, or None if it is missing or expired"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Get the cached values of all the keys that are present"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        if self._cnx is not None and keys:
+            now = time.time()
+            with self._lock:
+                try:
+                    for key in keys:
+                        row = self._cnx.execute(
+                            "SELECT value, created FROM cache WHERE key = ?", (key,)
+                        ).fetchone()
+                        if row is None:
+                            continue
+                        value, created = row
+                        if self.ttl is not None and created + self.ttl < now:
+                            self._delete(key)
+                            continue
+                        found[key] = value
+                    self._cnx.executemany(
+                        "UPDATE cache SET accessed = ? WHERE key = ?",
+                        [(now, key) for key in found],
+                    )
+                    self._cnx.commit()
+                except sqlite3.OperationalError as e:
+                    self._rollback("read", e)
+                    found = {}
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def set(self, key: str, value: bytes) -> None:
+        """Store a value, evicting old entries if the cache grows too large"""
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[str, bytes]) -> None:
+        """Store several values in one transaction"""
+        if self._cnx is None or not items:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                for key in items:
+                    self._delete(key)
+                self._cnx.executemany(
+                    "INSERT INTO cache (key, value, size, created, accessed)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (key, value, len(value), now, now)
+                        for key, value in items.items()
+                    ],
+                )
+                if self._stored_bytes() > self.max_bytes:
+                    self._evict()
+                self._cnx.commit()
+            except sqlite3.OperationalError as e:
+                self._rollback("write", e)
+
+    def _delete(self, key: str) -> None:
+        self._cnx.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def _stored_bytes(self) -> int:
+        """The size of the values stored, by every process sharing the file"""
+        return self._cnx.execute("SELECT bytes FROM cache_size").fetchone()[0]
+
+    def _rollback(self, operation: str, error: sqlite3.Error) -> None:
+        logger.debug(f"Cache '{self.filename}' {operation} failed: {error}")
+        try:
+            self._cnx.rollback()
+        except sqlite3.Error:
+            pass
+
+    def _evict(self) -> None:
+        """Drop least recently read entries until the cache is 90% full"""
+        target = self.max_bytes * 0.9
+        stored = self._stored_bytes()
+        # Reads the accessed index only as far as needed
+        rows = self._cnx.execute("SELECT key, size FROM cache ORDER BY accessed")
+        evicted = []
+        for key, size in rows:
+            if stored <= target:
+                break
+            evicted.append((key,))
+            stored -= size
+        rows.close()
+        self._cnx.executemany("DELETE FROM cache WHERE key = ?", evicted)
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters"""
+        if self._cnx is not None:
+            with self._lock:
+                try:
+                    self._cnx.execute("DELETE FROM cache")
+                    self._cnx.commit()
+                except sqlite3.OperationalError as e:
+                    self._rollback("clear", e)
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters and the number of bytes stored"""
+        stored = 0
+        if self._cnx is not None:
+            with self._lock:
+                try:
+                    stored = self._stored_bytes()
+                except sqlite3.OperationalError as e:
+                    self._rollback("read", e)
+        return {"hits": self.hits, "misses": self.misses, "bytes": stored}
@@ -0,0 +1,142 @@
+"""A disk cache of HTTP GET responses with conditional revalidation"""
+from __future__ import annotations
+
+import json
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from autogpt.disk_cache import DiskCache, cache_key
+
+# The response headers kept with a cached body
+STORED_HEADERS = (
+    "Cache-Control",
+    "Content-Type",
+    "Date",
+    "ETag",
+    "Expires",
+    "Last-Modified",
+)
+MAX_AGE = re.compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)", re.IGNORECASE)
+
+
+class HTTPCache:
+    """Caches the bodies of successful GET responses in a DiskCache
+
+    A response is reused without a request while it is fresh: for its
+    Cache-Control max-age, until its Expires date, or for `default_ttl`
+    seconds if it has neither. Once stale, it is revalidated with
+    If-None-Match / If-Modified-Since when it has an ETag or Last-Modified,
+    and served from the cache on a 304. Responses marked no-store or varying
+    on every header are not cached, and no-cache ones are always revalidated.
+    """
+
+    def __init__(self, disk_cache: DiskCache, default_ttl: float) -> None:
+        self.disk_cache = disk_cache
+        self.default_ttl = default_ttl
+
+    def get(
+        self, session: requests.Session, url: str, timeout: float, **kwargs: Any
+    ) -> Response:
+        """GET a URL through the cache
+
+        Args:
+            session (requests.Session): The session to send requests with
+            url (str): The URL to get
+            timeout (float): The timeout of the request, if one is sent
+            **kwargs: Other options of the request, passed to session.get
+
+        Returns:
+            Response: The response, read from the cache or from the server
+        """
+        key = cache_key("GET", url)
+        entry = self._load(key)
+        headers = {}
+        if entry is not None:
+            meta, content = entry
+            if time.time() < meta["expires"]:
+                return _cached_response(meta, content)
+            if "ETag" in meta["headers"]:
+                headers["If-None-Match"] = meta["headers"]["ETag"]
+            if "Last-Modified" in meta["headers"]:
+                headers["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+
+        response = session.get(url, timeout=timeout, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            meta, content = entry
+            meta["headers"].update(_stored_headers(response.headers))
+            meta["expires"] = self._expires(meta["headers"])
+            self._store(key, meta, content)
+            return _cached_response(meta, content)
+        if response.status_code == 200 and _is_cacheable(response.headers):
+            stored_headers = _stored_headers(response.headers)
+            meta = {
+                "url": response.url,
+                "encoding": response.encoding,
+                "headers": stored_headers,
+                "expires": self._expires(stored_headers),
+            }
+            self._store(key, meta, response.content)
+        return response
+
+    def _expires(self, headers: Dict[str, str]) -> float:
+        """When a response with these headers becomes stale"""
+        now = time.time()
+        cache_control = headers.get("Cache-Control", "").lower()
+        if "no-cache" in cache_control:
+            return now
+        max_age = MAX_AGE.search(cache_control)
+        if max_age:
+            return now + int(max_age.group(1))
+        if "Expires" in headers:
+            try:
+                expires = parsedate_to_datetime(headers["Expires"]).timestamp()
+                date = (
+                    parsedate_to_datetime(headers["Date"]).timestamp()
+                    if "Date" in headers
+                    else now
+                )
+            except (TypeError, ValueError):
+                # An invalid Expires date means the response is already stale
+                return now
+            return now + expires - date
+        return now + self.default_ttl
+
+    def _load(self, key: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        value = self.disk_cache.get(key)
+        if value is None:
+            return None
+        meta, content = value.split(b"\n", 1)
+        return json.loads(meta), content
+
+    def _store(self, key: str, meta: Dict[str, Any], content: bytes) -> None:
+        self.disk_cache.set(key, json.dumps(meta).encode("utf-8") + b"\n" + content)
+
+
+def _is_cacheable(headers: CaseInsensitiveDict) -> bool:
+    return (
+        "no-store" not in headers.get("Cache-Control", "").lower()
+        and headers.get("Vary", "").strip() != "*"
+    )
+
+
+def _stored_headers(headers: CaseInsensitiveDict) -> Dict[str, str]:
+    return {name: headers[name] for name in STORED_HEADERS if name in headers}
+
+
+def _cached_response(meta: Dict[str, Any], content: bytes) -> Response:
+    """A response built from a cache entry, as requests would have returned it"""
+    response = Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.url = meta["url"]
+    response.encoding = meta["encoding"]
+    response.headers = CaseInsensitiveDict(meta["headers"])
+    response._content = content
+    return response
@@ -0,0 +1,123 @@
+"""Incremental parsing of a JSON object whose text arrives in pieces"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+Path = Tuple[Union[str, int], ...]
+
+
+@dataclass
+class _Container:
+    """An object or array whose closing bracket has not been seen yet"""
+
+    kind: str
+    path: Path
+    start: int
+    # The key of the current member of an object, once it has been read
+    key: Optional[str] = None
+    # The index of the current element of an array
+    index: int = 0
+
+
+class IncrementalJSONParser:
+    """Parses the first JSON object of a text fed piece by piece
+
+    Every value nested at most `max_depth` levels below the root is reported to
+    `on_value(path, value)` as soon as its last character arrives, e.g.
+    `(("thoughts", "text"), "...")` once that string is closed. Text before the
+    root object is skipped; once the root object closes, `done` is set, `value`
+    holds the parsed object and further input is ignored. Values that are not
+    valid JSON are not reported, and leave `value` as None.
+    """
+
+    def __init__(
+        self, on_value: Callable[[Path, Any], None], max_depth: int = 2
+    ) -> None:
+        self.on_value = on_value
+        self.max_depth = max_depth
+        self.text = ""
+        self.done = False
+        self.value: Any = None
+        self._stack: List[_Container] = []
+        self._in_string = False
+        self._escaped = False
+        self._token_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> None:
+        """Parse the next piece of the text"""
+        start = len(self.text)
+        self.text += chunk
+        for i in range(start, len(self.text)):
+            if self.done:
+                return
+            self._consume(i, self.text[i])
+
+    def _consume(self, i: int, char: str) -> None:
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+                self._string_closed(i + 1)
+            return
+        if self._token_start is not None:
+            # Numbers, true, false and null end at the next delimiter
+            if char not in ",}] \t\r\n":
+                return
+            self._value_closed(self._child_path(), self._token_start, i)
+            self._token_start = None
+        if not self._stack:
+            if char == "{":
+                self._stack.append(_Container("{", (), i))
+            return
+        container = self._stack[-1]
+        if char == '"':
+            self._in_string = True
+            self._token_start = i
+        elif char in "{[":
+            self._stack.append(_Container(char, self._child_path(), i))
+        elif char in "}]":
+            self._stack.pop()
+            self._value_closed(container.path, container.start, i + 1)
+        elif char == ",":
+            if container.kind == "{":
+                container.key = None
+            else:
+                container.index += 1
+        elif char != ":" and not char.isspace():
+            self._token_start = i
+
+    def _child_path(self) -> Path:
+        """The path of the value starting at the current position"""
+        container = self._stack[-1]
+        if container.kind == "{":
+            return container.path + (container.key,)
+        return container.path + (container.index,)
+
+    def _string_closed(self, end: int) -> None:
+        start, self._token_start = self._token_start, None
+        container = self._stack[-1]
+        if container.kind == "{" and container.key is None:
+            try:
+                container.key = json.loads(self.text[start:end])
+            except json.JSONDecodeError:
+                container.key = self.text[start + 1 : end - 1]
+            return
+        self._value_closed(self._child_path(), start, end)
+
+    def _value_closed(self, path: Path, start: int, end: int) -> None:
+        if len(path) > self.max_depth:
+            return
+        try:
+            value = json.loads(self.text[start:end])
+        except json.JSONDecodeError:
+            value = None
+        else:
+            self.on_value(path, value)
+        if not path:
+            self.done = True
+            self.value = value
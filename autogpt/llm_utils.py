@@ -1,20 +1,43 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import threading
 import time
-from typing import List, Optional
+import weakref
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+import aiohttp
+import numpy as np
 import openai
 from colorama import Fore, Style
 from openai.error import APIError, RateLimitError
 
 from autogpt.config import Config
+from autogpt.disk_cache import DiskCache, cache_key
 from autogpt.logs import logger
+from autogpt.rate_limiter import Priority, RateLimiter, create_state_store
+from autogpt.token_counter import count_message_tokens, count_tokens_batch
 from autogpt.types.openai import Message
 
 CFG = Config()
 
 openai.api_key = CFG.openai_api_key
 
+EMBEDDING_MODEL = "text-embedding-ada-002"
+# Limits of a single request to the embeddings endpoint
+EMBEDDING_MAX_INPUTS = 2048
+EMBEDDING_MAX_TOKENS_PER_REQUEST = 100000
+_embedding_cache: Optional[DiskCache] = None
+_embedding_coalescer: Optional[EmbeddingCoalescer] = None
+_response_cache: Optional[DiskCache] = None
+_rate_limiter: Optional[RateLimiter] = None
+# Connections kept open by the HTTP session of each event loop
+AIOHTTP_CONNECTION_LIMIT = 20
+_aiohttp_sessions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
 
 def call_ai_function(
     function: str, args: list, description: str, model: str | None = None
@@ -58,6 +81,9 @@ def create_chat_completion(
     model: Optional[str] = None,
     temperature: float = CFG.temperature,
     max_tokens: Optional[int] = None,
+    priority: Priority = Priority.AGENT,
+    on_token: Optional[Callable[[str], Optional[bool]]] = None,
+    on_stream_start: Optional[Callable[[], None]] = None,
 ) -> str:
     """Create a chat completion using the OpenAI API
 
@@ -66,6 +92,14 @@ def create_chat_completion(
         model (str, optional): The model to use. Defaults to None.
         temperature (float, optional): The temperature to use. Defaults to 0.9.
         max_tokens (int, optional): The max tokens to use. Defaults to None.
+        priority (Priority, optional): The rate limiting class of the request.
+            Defaults to Priority.AGENT.
+        on_token (Callable, optional): If given, the reply is streamed and each
+            piece of it is passed to on_token as it arrives. Streaming stops
+            early when on_token returns True. Defaults to None.
+        on_stream_start (Callable, optional): Called before each attempt to
+            stream the reply, so that on_token can drop the pieces of an
+            attempt that failed. Defaults to None.
 
     Returns:
         str: The response from the chat completion
@@ -76,6 +110,133 @@ def create_chat_completion(
         print(
             f"{Fore.GREEN}Creating chat completion with model {model}, temperature {temperature}, max_tokens {max_tokens}{Fore.RESET}"
         )
+    message = _plugin_chat_completion(messages, model, temperature, max_tokens)
+    if message is not None:
+        return _replay(message, on_token)
+    kwargs = _chat_completion_kwargs(messages, model, temperature, max_tokens)
+    key = _response_cache_key(kwargs)
+    cached = _cached_response(key)
+    if cached is not None:
+        return _on_response(_replay(cached, on_token))
+    if on_token is not None:
+        kwargs["stream"] = True
+    limiter = get_rate_limiter()
+    tokens = _chat_completion_tokens(kwargs) if limiter is not None else 0
+    reply = None
+    for attempt in range(num_retries):
+        backoff = 2 ** (attempt + 2)
+        try:
+            if limiter is not None:
+                limiter.acquire(tokens, priority)
+            response = openai.ChatCompletion.create(**kwargs)
+            if on_token is None:
+                _settle_usage(limiter, tokens, response)
+                reply = response.choices[0].message["content"]
+            else:
+                if on_stream_start is not None:
+                    on_stream_start()
+                reply, stopped = _read_stream(response, on_token)
+                if stopped:
+                    # Only complete replies are cached
+                    key = None
+            break
+        except (RateLimitError, APIError) as e:
+            warned_user = _handle_api_error(e, attempt, num_retries, warned_user)
+        if CFG.debug_mode:
+            print(
+                f"{Fore.RED}Error: ",
+                f"API Bad gateway. Waiting {backoff} seconds...{Fore.RESET}",
+            )
+        time.sleep(backoff)
+    return _chat_completion_result(reply, num_retries, key)
+
+
+async def acreate_chat_completion(
+    messages: List[Message],  # type: ignore
+    model: Optional[str] = None,
+    temperature: float = CFG.temperature,
+    max_tokens: Optional[int] = None,
+    priority: Priority = Priority.AGENT,
+    on_token: Optional[Callable[[str], Optional[bool]]] = None,
+    on_stream_start: Optional[Callable[[], None]] = None,
+) -> str:
+    """Create a chat completion without blocking the event loop
+
+    Retries, Azure deployments and plugins are handled like in
+    create_chat_completion; requests share a pooled keep-alive HTTP session.
+
+    Args:
+        messages (List[Message]): The messages to send to the chat completion
+        model (str, optional): The model to use. Defaults to None.
+        temperature (float, optional): The temperature to use. Defaults to 0.9.
+        max_tokens (int, optional): The max tokens to use. Defaults to None.
+        priority (Priority, optional): The rate limiting class of the request.
+            Defaults to Priority.AGENT.
+        on_token (Callable, optional): If given, the reply is streamed and each
+            piece of it is passed to on_token as it arrives. Streaming stops
+            early when on_token returns True. Defaults to None.
+        on_stream_start (Callable, optional): Called before each attempt to
+            stream the reply, so that on_token can drop the pieces of an
+            attempt that failed. Defaults to None.
+
+    Returns:
+        str: The response from the chat completion
+    """
+    num_retries = 10
+    warned_user = False
+    if CFG.debug_mode:
+        print(
+            f"{Fore.GREEN}Creating chat completion with model {model}, temperature {temperature}, max_tokens {max_tokens}{Fore.RESET}"
+        )
+    message = _plugin_chat_completion(messages, model, temperature, max_tokens)
+    if message is not None:
+        return _replay(message, on_token)
+    kwargs = _chat_completion_kwargs(messages, model, temperature, max_tokens)
+    key = _response_cache_key(kwargs)
+    cached = _cached_response(key)
+    if cached is not None:
+        return _on_response(_replay(cached, on_token))
+    if on_token is not None:
+        kwargs["stream"] = True
+    limiter = get_rate_limiter()
+    tokens = _chat_completion_tokens(kwargs) if limiter is not None else 0
+    reply = None
+    for attempt in range(num_retries):
+        backoff = 2 ** (attempt + 2)
+        try:
+            if limiter is not None:
+                await limiter.aacquire(tokens, priority)
+            with _pooled_session():
+                response = await openai.ChatCompletion.acreate(**kwargs)
+                if on_token is None:
+                    _settle_usage(limiter, tokens, response)
+                    reply = response.choices[0].message["content"]
+                else:
+                    if on_stream_start is not None:
+                        on_stream_start()
+                    reply, stopped = await _aread_stream(response, on_token)
+                    if stopped:
+                        # Only complete replies are cached
+                        key = None
+            break
+        except (RateLimitError, APIError) as e:
+            warned_user = _handle_api_error(e, attempt, num_retries, warned_user)
+        if CFG.debug_mode:
+            print(
+                f"{Fore.RED}Error: ",
+                f"API Bad gateway. Waiting {backoff} seconds...{Fore.RESET}",
+            )
+        await asyncio.sleep(backoff)
+    return _chat_completion_result(reply, num_retries, key)
+
+
+def _plugin_chat_completion(
+    messages: List[Message],  # type: ignore
+    model: Optional[str],
+    temperature: float,
+    max_tokens: Optional[int],
+) -> Optional[str]:
+    """The reply of the first plugin that handles the chat completion, if any"""
     for plugin in CFG.plugins:
         if plugin.can_handle_chat_completion(
             messages=messages,
@@ -91,49 +252,96 @@ def create_chat_completion(
             )
             if message is not None:
                 return message
-    response = None
-    for attempt in range(num_retries):
-        backoff = 2 ** (attempt + 2)
-        try:
-            if CFG.use_azure:
-                response = openai.ChatCompletion.create(
-                    deployment_id=CFG.get_azure_deployment_id_for_model(model),
-                    model=model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                )
-            else:
-                response = openai.ChatCompletion.create(
-                    model=model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                )
-            break
-        except RateLimitError:
-            if CFG.debug_mode:
-                print(
-                    f"{Fore.RED}Error: ", f"Reached rate limit, passing...{Fore.RESET}"
-                )
-            if not warned_user:
-                logger.double_check(
-                    f"Please double check that you have setup a {Fore.CYAN + Style.BRIGHT}PAID{Style.RESET_ALL} OpenAI API Account. "
-                    + f"You can read more here: {Fore.CYAN}https://github.com/Significant-Gravitas/Auto-GPT#openai-api-keys-configuration{Fore.RESET}"
-                )
-                warned_user = True
-        except APIError as e:
-            if e.http_status != 502:
-                raise
-            if attempt == num_retries - 1:
-                raise
+    return None
+
+
+def _chat_completion_kwargs(
+    messages: List[Message],  # type: ignore
+    model: Optional[str],
+    temperature: float,
+    max_tokens: Optional[int],
+) -> Dict[str, Any]:
+    """The arguments of a chat completion request, with the Azure deployment"""
+    kwargs = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+    if CFG.use_azure:
+        kwargs["deployment_id"] = CFG.get_azure_deployment_id_for_model(model)
+    return kwargs
+
+
+def _handle_api_error(
+    error: Exception, attempt: int, num_retries: int, warned_user: bool
+) -> bool:
+    """Re-raise errors that should not be retried and warn about rate limits
+
+    Returns:
+        bool: Whether the user has been warned about rate limits
+    """
+    if isinstance(error, RateLimitError):
+        _record_rate_limit(error)
         if CFG.debug_mode:
-            print(
-                f"{Fore.RED}Error: ",
-                f"API Bad gateway. Waiting {backoff} seconds...{Fore.RESET}",
+            print(f"{Fore.RED}Error: ", f"Reached rate limit, passing...{Fore.RESET}")
+        if not warned_user:
+            logger.double_check(
+                f"Please double check that you have setup a {Fore.CYAN + Style.BRIGHT}PAID{Style.RESET_ALL} OpenAI API Account. "
+                + f"You can read more here: {Fore.CYAN}https://github.com/Significant-Gravitas/Auto-GPT#openai-api-keys-configuration{Fore.RESET}"
             )
-        time.sleep(backoff)
-    if response is None:
+        return True
+    if error.http_status != 502 or attempt == num_retries - 1:
+        raise error
+    return warned_user
+
+
+def _read_stream(
+    response, on_token: Callable[[str], Optional[bool]]
+) -> Tuple[str, bool]:
+    """Collect a streamed reply, passing each piece of it to on_token
+
+    Returns the reply and whether on_token stopped it early, in which case the
+    stream is closed, dropping the connection to the API.
+    """
+    pieces = []
+    for chunk in response:
+        piece = chunk["choices"][0]["delta"].get("content")
+        if piece:
+            pieces.append(piece)
+            if on_token(piece):
+                response.close()
+                return "".join(pieces), True
+    return "".join(pieces), False
+
+
+async def _aread_stream(
+    response, on_token: Callable[[str], Optional[bool]]
+) -> Tuple[str, bool]:
+    """Collect a streamed reply like _read_stream, without blocking the event loop"""
+    pieces = []
+    async for chunk in response:
+        piece = chunk["choices"][0]["delta"].get("content")
+        if piece:
+            pieces.append(piece)
+            if on_token(piece):
+                await response.aclose()
+                return "".join(pieces), True
+    return "".join(pieces), False
+
+
+def _replay(reply: str, on_token: Optional[Callable[[str], Optional[bool]]]) -> str:
+    """Pass a reply that was not streamed to on_token in one piece"""
+    if on_token is not None:
+        on_token(reply)
+    return reply
+
+
+def _chat_completion_result(
+    reply: Optional[str], num_retries: int, key: Optional[str]
+) -> str:
+    """The reply text after the plugins have processed it"""
+    if reply is None:
         logger.typewriter_log(
             "FAILED TO GET RESPONSE FROM OPENAI",
             Fore.RED,
@@ -145,7 +353,12 @@ def create_chat_completion(
             raise RuntimeError(f"Failed to get response after {num_retries} retries")
         else:
             quit(1)
-    resp = response.choices[0].message["content"]
+    if key is not None:
+        get_response_cache().set(key, reply.encode("utf-8"))
+    return _on_response(reply)
+
+
+def _on_response(resp: str) -> str:
     for plugin in CFG.plugins:
         if not plugin.can_handle_on_response():
             continue
@@ -153,25 +366,333 @@ def create_chat_completion(
     return resp
 
 
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """The rate limiter shared by all API calls, if limits or a shared store are set"""
+    global _rate_limiter
+    if _rate_limiter is None and (
+        CFG.openai_requests_per_minute
+        or CFG.openai_tokens_per_minute
+        or CFG.rate_limit_store != "memory"
+    ):
+        _rate_limiter = RateLimiter(
+            CFG.openai_requests_per_minute,
+            CFG.openai_tokens_per_minute,
+            store=create_state_store(CFG, CFG.openai_api_key or ""),
+        )
+    return _rate_limiter
+
+
+def _record_rate_limit(error: RateLimitError) -> None:
+    """Share what a rate limit error tells about the limits with the limiter"""
+    limiter = get_rate_limiter()
+    if limiter is not None:
+        limiter.record_limits(error.headers)
+
+
+def _chat_completion_tokens(kwargs: Dict[str, Any]) -> int:
+    """Tokens a chat completion counts against the limit: the prompt and the reply"""
+    try:
+        prompt_tokens = count_message_tokens(kwargs["messages"], kwargs["model"])
+    except (KeyError, NotImplementedError):
+        prompt_tokens = sum(len(m["content"]) for m in kwargs["messages"]) // 4
+    return prompt_tokens + (kwargs["max_tokens"] or 0)
+
+
+def _embedding_tokens(texts: List[str]) -> int:
+    return sum(count_tokens_batch(texts, EMBEDDING_MODEL))
+
+
+def _settle_usage(limiter: Optional[RateLimiter], tokens: int, response) -> None:
+    """Correct the limiter's estimate with the usage reported by the API"""
+    usage = response.get("usage") if limiter is not None else None
+    if usage is not None:
+        limiter.adjust(usage["total_tokens"] - tokens)
+
+
+def get_response_cache() -> Optional[DiskCache]:
+    """The cache of deterministic chat completions, if LLM_RESPONSE_CACHE is on"""
+    global _response_cache
+    if _response_cache is None and CFG.llm_response_cache:
+        _response_cache = DiskCache(
+            CFG.llm_response_cache_file,
+            CFG.llm_response_cache_size_mb * 2**20,
+            ttl=CFG.llm_response_cache_ttl,
+        )
+    return _response_cache
+
+
+def _response_cache_key(kwargs: Dict[str, Any]) -> Optional[str]:
+    """Cache key of a chat completion request, or None if it is not cacheable
+
+    Only requests at temperature 0 are cached, as other replies are sampled.
+    """
+    if kwargs["temperature"] != 0 or get_response_cache() is None:
+        return None
+    return cache_key(
+        str(kwargs["model"]),
+        json.dumps(kwargs["messages"], sort_keys=True),
+        str(kwargs["temperature"]),
+        str(kwargs["max_tokens"]),
+    )
+
+
+def _cached_response(key: Optional[str]) -> Optional[str]:
+    if key is None:
+        return None
+    cached = get_response_cache().get(key)
+    if cached is None:
+        return None
+    logger.debug(f"Using cached chat completion: {get_response_cache().stats()}")
+    return cached.decode("utf-8")
+
+
+def get_aiohttp_session() -> aiohttp.ClientSession:
+    """The keep-alive HTTP session shared by API calls on the running event loop"""
+    loop = asyncio.get_running_loop()
+    session = _aiohttp_sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=AIOHTTP_CONNECTION_LIMIT)
+        )
+        _aiohttp_sessions[loop] = session
+    return session
+
+
+async def close_aiohttp_session() -> None:
+    """Close the HTTP session of the running event loop, if one was opened"""
+    session = _aiohttp_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+@contextmanager
+def _pooled_session() -> Iterator[None]:
+    """Make the OpenAI SDK send async requests through the shared session"""
+    token = openai.aiosession.set(get_aiohttp_session())
+    try:
+        yield
+    finally:
+        openai.aiosession.reset(token)
+
+
+def get_embedding_cache() -> Optional[DiskCache]:
+    """The embedding cache shared by all memory backends, if enabled"""
+    global _embedding_cache
+    if _embedding_cache is None and CFG.embedding_cache:
+        _embedding_cache = DiskCache(
+            CFG.embedding_cache_file, CFG.embedding_cache_size_mb * 2**20
+        )
+    return _embedding_cache
+
+
+def embedding_cache_key(text: str, model: str = EMBEDDING_MODEL) -> str:
+    """Cache key of a text's embedding; runs of whitespace are not significant"""
+    return cache_key(model, " ".join(text.split()))
+
+
+class EmbeddingCoalescer:
+    """Merges embedding requests made concurrently from several threads
+
+    The first request starts a short window; every request submitted during
+    the window is embedded together with it in one batch.
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, Future]] = []
+        self._timer: Optional[threading.Timer] = None
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for the next batch; the future resolves to its embedding"""
+        future = Future()
+        with self._lock:
+            self._pending.append((text, future))
+            if len(self._pending) < EMBEDDING_MAX_INPUTS:
+                if self._timer is None:
+                    self._timer = threading.Timer(self.window, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return future
+        self.flush()
+        return future
+
+    def embed(self, text: str) -> list:
+        """Embed a text as part of a batch, waiting for the result"""
+        return self.submit(text).result()
+
+    def flush(self) -> None:
+        """Embed every queued text now"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not batch:
+            return
+        try:
+            embeddings = create_embeddings_batch([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for i, (_, future) in enumerate(batch):
+            future.set_result(embeddings[i] if embeddings is not None else None)
+
+
+def get_embedding_coalescer() -> Optional[EmbeddingCoalescer]:
+    """The shared embedding coalescer, if EMBEDDING_BATCH_WINDOW_MS is set"""
+    global _embedding_coalescer
+    if _embedding_coalescer is None and CFG.embedding_batch_window_ms > 0:
+        _embedding_coalescer = EmbeddingCoalescer(CFG.embedding_batch_window_ms / 1000)
+    return _embedding_coalescer
+
+
 def create_embedding_with_ada(text) -> list:
     """Create an embedding with text-ada-002 using the OpenAI SDK"""
+    coalescer = get_embedding_coalescer()
+    if coalescer is not None:
+        return coalescer.embed(text)
+    embeddings = create_embeddings_batch([text])
+    return embeddings[0] if embeddings is not None else None
+
+
+def create_embeddings_batch(texts: List[str]) -> List[list]:
+    """Create text-ada-002 embeddings for several texts in as few requests as possible
+
+    Texts found in the embedding cache are not sent to the API. The others are
+    split into requests that stay within the endpoint's input and token limits.
+
+    Args:
+        texts (List[str]): The texts to embed
+
+    Returns:
+        List[list]: The embeddings, in the same order as the texts
+    """
+    cache = get_embedding_cache()
+    if cache is None:
+        return _request_embeddings(texts)
+    keys, cached, missing = _lookup_embeddings(cache, texts)
+    if missing:
+        embeddings = _request_embeddings(list(missing.values()))
+        if embeddings is None:
+            return None
+        _store_embeddings(cache, cached, missing, embeddings)
+    return [np.frombuffer(cached[key], dtype=np.float32).tolist() for key in keys]
+
+
+async def acreate_embedding(text: str) -> list:
+    """Create an embedding without blocking the event loop"""
+    embeddings = await acreate_embeddings_batch([text])
+    return embeddings[0] if embeddings is not None else None
+
+
+async def acreate_embeddings_batch(texts: List[str]) -> List[list]:
+    """Create embeddings like create_embeddings_batch, without blocking the event loop
+
+    Args:
+        texts (List[str]): The texts to embed
+
+    Returns:
+        List[list]: The embeddings, in the same order as the texts
+    """
+    cache = get_embedding_cache()
+    if cache is None:
+        return await _arequest_embeddings(texts)
+    keys, cached, missing = _lookup_embeddings(cache, texts)
+    if missing:
+        embeddings = await _arequest_embeddings(list(missing.values()))
+        if embeddings is None:
+            return None
+        _store_embeddings(cache, cached, missing, embeddings)
+    return [np.frombuffer(cached[key], dtype=np.float32).tolist() for key in keys]
+
+
+def _lookup_embeddings(
+    cache: DiskCache, texts: List[str]
+) -> Tuple[List[str], Dict[str, bytes], Dict[str, str]]:
+    """The cache key of each text, the cached embeddings and the texts to request"""
+    keys = [embedding_cache_key(text) for text in texts]
+    cached = cache.get_many(keys)
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cached:
+            missing.setdefault(key, text)
+    return keys, cached, missing
+
+
+def _store_embeddings(
+    cache: DiskCache,
+    cached: Dict[str, bytes],
+    missing: Dict[str, str],
+    embeddings: List[list],
+) -> None:
+    """Add the embeddings of the missing texts to the cache and to `cached`"""
+    created = {
+        key: np.asarray(embedding, dtype=np.float32).tobytes()
+        for key, embedding in zip(missing, embeddings)
+    }
+    cache.set_many(created)
+    cached.update(created)
+
+
+def split_embedding_requests(texts: List[str]) -> Iterator[List[str]]:
+    """Group texts into consecutive batches that each fit in a single request"""
+    batch: List[str] = []
+    batch_tokens = 0
+    for text, tokens in zip(texts, count_tokens_batch(texts, EMBEDDING_MODEL)):
+        if batch and (
+            len(batch) == EMBEDDING_MAX_INPUTS
+            or batch_tokens + tokens > EMBEDDING_MAX_TOKENS_PER_REQUEST
+        ):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def _request_embeddings(texts: List[str]) -> List[list]:
+    """Request the embeddings of texts from the API, one request per batch"""
+    embeddings = []
+    for batch in split_embedding_requests(texts):
+        batch_embeddings = _request_embeddings_batch(batch)
+        if batch_embeddings is None:
+            return None
+        embeddings.extend(batch_embeddings)
+    return embeddings
+
+
+def _embedding_kwargs(texts: List[str]) -> Dict[str, Any]:
+    """The arguments of an embeddings request, with the Azure deployment"""
+    if CFG.use_azure:
+        return {
+            "input": texts,
+            "engine": CFG.get_azure_deployment_id_for_model(EMBEDDING_MODEL),
+        }
+    return {"input": texts, "model": EMBEDDING_MODEL}
+
+
+def _embeddings_from_response(response) -> List[list]:
+    data = sorted(response["data"], key=lambda item: item["index"])
+    return [item["embedding"] for item in data]
+
+
+def _request_embeddings_batch(texts: List[str]) -> List[list]:
+    """Request the embeddings of texts in one request, retrying on rate limits"""
     num_retries = 10
+    limiter = get_rate_limiter()
+    tokens = _embedding_tokens(texts) if limiter is not None else 0
     for attempt in range(num_retries):
         backoff = 2 ** (attempt + 2)
         try:
-            if CFG.use_azure:
-                return openai.Embedding.create(
-                    input=[text],
-                    engine=CFG.get_azure_deployment_id_for_model(
-                        "text-embedding-ada-002"
-                    ),
-                )["data"][0]["embedding"]
-            else:
-                return openai.Embedding.create(
-                    input=[text], model="text-embedding-ada-002"
-                )["data"][0]["embedding"]
-        except RateLimitError:
-            pass
+            if limiter is not None:
+                limiter.acquire(tokens, Priority.EMBEDDING)
+            response = openai.Embedding.create(**_embedding_kwargs(texts))
+            return _embeddings_from_response(response)
+        except RateLimitError as e:
+            _record_rate_limit(e)
         except APIError as e:
             if e.http_status != 502:
                 raise
@@ -183,3 +704,44 @@ def create_embedding_with_ada(text) -> list:
                 f"API Bad gateway. Waiting {backoff} seconds...{Fore.RESET}",
             )
         time.sleep(backoff)
+
+
+async def _arequest_embeddings(texts: List[str]) -> List[list]:
+    """Request the embeddings of texts, sending all the batches concurrently"""
+    batches = await asyncio.gather(
+        *(
+            _arequest_embeddings_batch(batch)
+            for batch in split_embedding_requests(texts)
+        )
+    )
+    if any(batch is None for batch in batches):
+        return None
+    return [embedding for batch in batches for embedding in batch]
+
+
+async def _arequest_embeddings_batch(texts: List[str]) -> List[list]:
+    """Request the embeddings of texts in one request, retrying on rate limits"""
+    num_retries = 10
+    limiter = get_rate_limiter()
+    tokens = _embedding_tokens(texts) if limiter is not None else 0
+    for attempt in range(num_retries):
+        backoff = 2 ** (attempt + 2)
+        try:
+            if limiter is not None:
+                await limiter.aacquire(tokens, Priority.EMBEDDING)
+            with _pooled_session():
+                response = await openai.Embedding.acreate(**_embedding_kwargs(texts))
+            return _embeddings_from_response(response)
+        except RateLimitError as e:
+            _record_rate_limit(e)
+        except APIError as e:
+            if e.http_status != 502:
+                raise
+            if attempt == num_retries - 1:
+                raise
+        if CFG.debug_mode:
+            print(
+                f"{Fore.RED}Error: ",
+                f"API Bad gateway. Waiting {backoff} seconds...{Fore.RESET}",
+            )
+        await asyncio.sleep(backoff)
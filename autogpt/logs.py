@@ -1,4 +1,6 @@
 """Logging module for Auto-GPT."""
+from __future__ import annotations
+
 import json
 import logging
 import os
@@ -11,6 +13,7 @@ from logging import LogRecord
 from colorama import Fore, Style
 
 from autogpt.config import Config, Singleton
+from autogpt.json_utils.json_stream import IncrementalJSONParser
 from autogpt.speech import say_text
 
 CFG = Config()
@@ -294,39 +297,79 @@ def print_assistant_thoughts(ai_name, assistant_reply):
         logger.error("Error: \n", call_stack)
 
 
+THOUGHT_FIELDS = ("text", "reasoning", "plan", "criticism", "speak")
+
+
 def print_assistant_thoughts(
     ai_name: object, assistant_reply_json_valid: object
 ) -> None:
-    assistant_thoughts_reasoning = None
-    assistant_thoughts_plan = None
-    assistant_thoughts_speak = None
-    assistant_thoughts_criticism = None
-
     assistant_thoughts = assistant_reply_json_valid.get("thoughts", {})
-    assistant_thoughts_text = assistant_thoughts.get("text")
-    if assistant_thoughts:
-        assistant_thoughts_reasoning = assistant_thoughts.get("reasoning")
-        assistant_thoughts_plan = assistant_thoughts.get("plan")
-        assistant_thoughts_criticism = assistant_thoughts.get("criticism")
-        assistant_thoughts_speak = assistant_thoughts.get("speak")
-    logger.typewriter_log(
-        f"{ai_name.upper()} THOUGHTS:", Fore.YELLOW, f"{assistant_thoughts_text}"
-    )
-    logger.typewriter_log("REASONING:", Fore.YELLOW, f"{assistant_thoughts_reasoning}")
-    if assistant_thoughts_plan:
+    for field in THOUGHT_FIELDS:
+        print_assistant_thought(ai_name, field, assistant_thoughts.get(field))
+
+
+def print_assistant_thought(ai_name: object, field: str, value: object) -> None:
+    """Prints one field of the assistant's thoughts to the console"""
+    if field == "text":
+        logger.typewriter_log(f"{ai_name.upper()} THOUGHTS:", Fore.YELLOW, f"{value}")
+    elif field == "reasoning":
+        logger.typewriter_log("REASONING:", Fore.YELLOW, f"{value}")
+    elif field == "plan" and value:
         logger.typewriter_log("PLAN:", Fore.YELLOW, "")
         # If it's a list, join it into a string
-        if isinstance(assistant_thoughts_plan, list):
-            assistant_thoughts_plan = "\n".join(assistant_thoughts_plan)
-        elif isinstance(assistant_thoughts_plan, dict):
-            assistant_thoughts_plan = str(assistant_thoughts_plan)
+        if isinstance(value, list):
+            value = "\n".join(value)
+        elif isinstance(value, dict):
+            value = str(value)
 
         # Split the input_string using the newline character and dashes
-        lines = assistant_thoughts_plan.split("\n")
+        lines = value.split("\n")
         for line in lines:
             line = line.lstrip("- ")
             logger.typewriter_log("- ", Fore.GREEN, line.strip())
-    logger.typewriter_log("CRITICISM:", Fore.YELLOW, f"{assistant_thoughts_criticism}")
+    elif field == "criticism":
+        logger.typewriter_log("CRITICISM:", Fore.YELLOW, f"{value}")
     # Speak the assistant's thoughts
-    if CFG.speak_mode and assistant_thoughts_speak:
-        say_text(assistant_thoughts_speak)
+    elif field == "speak" and CFG.speak_mode and value:
+        say_text(value)
+
+
+class StreamedThoughtsPrinter:
+    """Prints the assistant's thoughts while its reply is being streamed
+
+    Each thought is printed as soon as its value is complete, and `feed`
+    returns True once the whole reply object has been received, so the rest
+    of the stream can be skipped. The printer only displays the thoughts: the
+    agent acts on the reply returned by the chat completion.
+    """
+
+    def __init__(self, ai_name: str, on_first_output=None) -> None:
+        self.ai_name = ai_name
+        self.printed = set()
+        self._on_first_output = on_first_output
+        self._parser = IncrementalJSONParser(self._on_value)
+
+    def feed(self, delta: str) -> bool:
+        self._parser.feed(delta)
+        return self._parser.done
+
+    def reset(self) -> None:
+        """Start over on a new attempt to stream the reply"""
+        self.printed = set()
+        self._parser = IncrementalJSONParser(self._on_value)
+
+    def _on_value(self, path, value) -> None:
+        if len(path) == 2 and path[0] == "thoughts" and path[1] in THOUGHT_FIELDS:
+            if not self.printed and self._on_first_output is not None:
+                self._on_first_output()
+            self.printed.add(path[1])
+            print_assistant_thought(self.ai_name, path[1], value)
+
+    def finish(self, assistant_reply_json: dict) -> None:
+        """Print the thoughts that were not streamed, in their usual order"""
+        assistant_thoughts = assistant_reply_json.get("thoughts", {})
+        for field in THOUGHT_FIELDS:
+            if field not in self.printed:
+                print_assistant_thought(
+                    self.ai_name, field, assistant_thoughts.get(field)
+                )
@@ -1,9 +1,10 @@
 from autogpt.memory.local import LocalCache
+from autogpt.memory.local_ann import LocalANNMemory
 from autogpt.memory.no_memory import NoMemory
 
 # List of supported memory backends
 # Add a backend to this list if the import attempt is successful
-supported_memory = ["local", "no_memory"]
+supported_memory = ["local", "local_ann", "no_memory"]
 
 try:
     from autogpt.memory.redismem import RedisMemory
@@ -74,6 +75,10 @@ def get_memory(cfg, init=False):
             )
         else:
             memory = MilvusMemory(cfg)
+    elif cfg.memory_backend == "local_ann":
+        memory = LocalANNMemory(cfg)
+        if init:
+            memory.clear()
     elif cfg.memory_backend == "no_memory":
         memory = NoMemory(cfg)
 
@@ -91,6 +96,7 @@ def get_supported_memory_backends():
 __all__ = [
     "get_memory",
     "LocalCache",
+    "LocalANNMemory",
     "RedisMemory",
     "PineconeMemory",
     "NoMemory",
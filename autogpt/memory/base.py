@@ -1,24 +1,17 @@
 """Base class for memory providers."""
 import abc
 
-import openai
-
-from autogpt.config import AbstractSingleton, Config
-
-cfg = Config()
+from autogpt.config import AbstractSingleton
+from autogpt.llm_utils import (
+    create_embedding_with_ada,
+    create_embeddings_batch,
+    get_embedding_cache,
+)
 
 
 def get_ada_embedding(text):
     text = text.replace("\n", " ")
-    if cfg.use_azure:
-        return openai.Embedding.create(
-            input=[text],
-            engine=cfg.get_azure_deployment_id_for_model("text-embedding-ada-002"),
-        )["data"][0]["embedding"]
-    else:
-        return openai.Embedding.create(input=[text], model="text-embedding-ada-002")[
-            "data"
-        ][0]["embedding"]
+    return create_embedding_with_ada(text)
 
 
 class MemoryProviderSingleton(AbstractSingleton):
@@ -26,6 +19,14 @@ class MemoryProviderSingleton(AbstractSingleton):
     def add(self, data):
         pass
 
+    def add_many(self, data):
+        """Add several items; backends that can store them in bulk override this"""
+        data = list(data)
+        if get_embedding_cache() is not None:
+            # Embed everything in batched requests; each add then hits the cache
+            create_embeddings_batch(data)
+        return [self.add(item) for item in data]
+
     @abc.abstractmethod
     def get(self, data):
         pass
@@ -38,6 +39,10 @@ class MemoryProviderSingleton(AbstractSingleton):
     def get_relevant(self, data, num_relevant=5):
         pass
 
+    def get_relevant_batch(self, queries, num_relevant=5):
+        """Run get_relevant for several queries; backends can batch this"""
+        return [self.get_relevant(query, num_relevant) for query in queries]
+
     @abc.abstractmethod
     def get_stats(self):
         pass
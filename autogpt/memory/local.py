@@ -2,16 +2,40 @@ from __future__ import annotations
 
 import dataclasses
 import os
+import struct
 from typing import Any, List
 
 import numpy as np
 import orjson
 
-from autogpt.llm_utils import create_embedding_with_ada
+from autogpt.llm_utils import create_embedding_with_ada, create_embeddings_batch
 from autogpt.memory.base import MemoryProviderSingleton
 
 EMBED_DIM = 1536
-SAVE_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_SERIALIZE_DATACLASS
+
+# On-disk layout: `{memory_index}.vectors.npy` is a regular .npy file whose header
+# is padded to a fixed size so the row count can be rewritten in place, followed
+# by the rows. `{memory_index}.texts` is a log of length-prefixed UTF-8
+# records. A row only counts once the header has been updated, which happens
+# after both the text and the vector have been written, so a crash mid-add leaves
+# a torn tail that is discarded on the next load.
+VECTORS_HEADER_SIZE = 128
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+TEXTS_MAGIC = b"AGPTTXT1"
+TEXT_LENGTH = struct.Struct("<I")
+# How a single embedding is stored, selected with LOCAL_MEMORY_DTYPE. int8 rows
+# carry a per-row scale so that an embedding is approximately `scale * values`.
+STORAGE_DTYPES = {
+    "float32": np.dtype((np.float32, (EMBED_DIM,))),
+    "float16": np.dtype((np.float16, (EMBED_DIM,))),
+    "int8": np.dtype([("scale", "<f4"), ("values", "i1", (EMBED_DIM,))]),
+}
+# Rows dequantized at a time when scoring float16 or int8 embeddings
+SCORE_BLOCK_ROWS = 16384
+# Smallest number of rows allocated for the embedding buffer; it doubles from there
+MIN_CAPACITY = 1024
+# Number of texts embedded before they are committed to the cache by add_many
+ADD_BATCH_SIZE = 100
 
 
 def create_default_embeddings():
@@ -20,14 +44,173 @@ def create_default_embeddings():
 
 @dataclasses.dataclass
 class CacheContent:
+    """The stored texts and a buffer holding their embeddings
+
+    The buffer has spare rows past `rows` so that adding a memory doesn't copy
+    the whole matrix; `embeddings` is the view of the rows in use, converted to
+    float32 if the buffer holds int8 rows.
+    """
+
     texts: List[str] = dataclasses.field(default_factory=list)
-    embeddings: np.ndarray = dataclasses.field(
-        default_factory=create_default_embeddings
-    )
+    buffer: np.ndarray = dataclasses.field(default_factory=create_default_embeddings)
+    rows: int = 0
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        view = self.buffer[: self.rows]
+        if view.dtype.names:
+            return dequantize(view)
+        view.flags.writeable = False
+        return view
+
+
+def quantize(vectors: np.ndarray, row_dtype: np.dtype) -> np.ndarray:
+    """Convert float32 embeddings to rows of the given storage dtype"""
+    if row_dtype.names is None:
+        return vectors.astype(row_dtype.base)
+    scale = np.abs(vectors).max(axis=1) / 127
+    scale[scale == 0] = 1
+    rows = np.empty(len(vectors), dtype=row_dtype)
+    rows["scale"] = scale
+    rows["values"] = np.rint(vectors / scale[:, np.newaxis])
+    return rows
+
+
+def dequantize(rows: np.ndarray) -> np.ndarray:
+    """Convert stored rows back to float32 embeddings"""
+    if rows.dtype.names is None:
+        return rows.astype(np.float32)
+    return rows["values"].astype(np.float32) * rows["scale"][:, np.newaxis]
+
+
+def score_rows(rows: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """Dot products between queries (m, EMBED_DIM) and stored rows, shape (m, n)
+
+    float16 and int8 rows are converted back to float32 one block at a time, so
+    the products are accumulated in float32 without materializing the matrix.
+    """
+    if rows.dtype == np.float32:
+        return np.dot(queries, rows.T)
+    scores = np.empty((len(queries), len(rows)), dtype=np.float32)
+    for start in range(0, len(rows), SCORE_BLOCK_ROWS):
+        block = rows[start : start + SCORE_BLOCK_ROWS]
+        if block.dtype.names is None:
+            block_scores = np.dot(queries, block.astype(np.float32).T)
+        else:
+            block_scores = np.dot(queries, block["values"].astype(np.float32).T)
+            block_scores *= block["scale"]
+        scores[:, start : start + len(block)] = block_scores
+    return scores
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores along the last axis, best first
+
+    Uses np.argpartition so only the k winners are sorted, not every score.
+    """
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+    top = np.argpartition(scores, -k, axis=-1)[..., -k:]
+    order = np.argsort(np.take_along_axis(scores, top, axis=-1), axis=-1)
+    return np.take_along_axis(top, order[..., ::-1], axis=-1)
+
+
+def vectors_header(rows: int, row_dtype: np.dtype = STORAGE_DTYPES["float32"]) -> bytes:
+    """Build the fixed-size .npy header describing `rows` embeddings"""
+    if row_dtype.names:
+        descr, shape = np.lib.format.dtype_to_descr(row_dtype), (rows,)
+    else:
+        descr, shape = row_dtype.base.str, (rows, EMBED_DIM)
+    header = repr({"descr": descr, "fortran_order": False, "shape": shape})
+    header = header.encode("latin1")
+    header = header.ljust(VECTORS_HEADER_SIZE - len(NPY_MAGIC) - 3) + b"\n"
+    return NPY_MAGIC + struct.pack("<H", len(header)) + header
+
+
+def read_vectors_header(filename: str) -> tuple[int, np.dtype]:
+    """Read the committed row count and the row storage dtype of a vector file"""
+    with open(filename, "rb") as f:
+        np.lib.format.read_magic(f)
+        shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+        header_size = f.tell()
+    row_dtype = dtype if dtype.names else np.dtype((dtype, shape[1:]))
+    if header_size != VECTORS_HEADER_SIZE or row_dtype not in STORAGE_DTYPES.values():
+        raise ValueError(f"Unsupported memory file '{filename}'")
+    return shape[0], row_dtype
+
+
+def read_texts(filename: str, limit: int) -> tuple[List[str], int]:
+    """Read up to `limit` complete records from a text log
+
+    Returns:
+        The texts read and the byte offset just past the last complete record
+    """
+    texts = []
+    with open(filename, "rb") as f:
+        if f.read(len(TEXTS_MAGIC)) != TEXTS_MAGIC:
+            raise ValueError(f"'{filename}' is not a LocalCache text log")
+        end = f.tell()
+        while len(texts) < limit:
+            prefix = f.read(TEXT_LENGTH.size)
+            if len(prefix) < TEXT_LENGTH.size:
+                break
+            (length,) = TEXT_LENGTH.unpack(prefix)
+            record = f.read(length)
+            if len(record) < length:
+                break
+            texts.append(record.decode("utf-8"))
+            end = f.tell()
+    return texts, end
+
+
+def write_cache_files(texts_filename: str, vectors_filename: str, data) -> None:
+    """Atomically replace both cache files with the given content"""
+    rows = np.ascontiguousarray(data.buffer[: data.rows])
+    with open(f"{texts_filename}.tmp", "wb") as f:
+        f.write(TEXTS_MAGIC)
+        for text in data.texts:
+            record = text.encode("utf-8")
+            f.write(TEXT_LENGTH.pack(len(record)))
+            f.write(record)
+    with open(f"{vectors_filename}.tmp", "wb") as f:
+        f.write(vectors_header(data.rows, rows.dtype))
+        f.write(rows.tobytes())
+    os.replace(f"{texts_filename}.tmp", texts_filename)
+    os.replace(f"{vectors_filename}.tmp", vectors_filename)
+
+
+def migrate_json_cache(
+    json_filename: str,
+    memory_index: str,
+    row_dtype: np.dtype = STORAGE_DTYPES["float32"],
+) -> int:
+    """Convert a `{memory_index}.json` file written by older versions
+
+    The JSON file is kept next to the new files with a `.bak` suffix.
+
+    Args:
+        json_filename: The JSON file to convert
+        memory_index: The memory index the new files are named after
+        row_dtype: How the embeddings are stored in the new files
+
+    Returns:
+        The number of memories migrated
+    """
+    with open(json_filename, "rb") as f:
+        file_content = f.read()
+    loaded = orjson.loads(file_content) if file_content.strip() else {}
+    texts = loaded.get("texts", [])
+    embeddings = np.array(loaded.get("embeddings", []), dtype=np.float32)
+    embeddings = quantize(embeddings.reshape(len(texts), EMBED_DIM), row_dtype)
+    data = CacheContent(texts, embeddings, rows=len(texts))
+    write_cache_files(f"{memory_index}.texts", f"{memory_index}.vectors.npy", data)
+    os.replace(json_filename, f"{json_filename}.bak")
+    return len(texts)
 
 
 class LocalCache(MemoryProviderSingleton):
-    """A class that stores the memory in a local file"""
+    """A class that stores the memory in local append-only files"""
 
     def __init__(self, cfg) -> None:
         """Initialize a class instance
@@ -38,26 +221,117 @@ class LocalCache(MemoryProviderSingleton):
         Returns:
             None
         """
-        self.filename = f"{cfg.memory_index}.json"
-        if os.path.exists(self.filename):
+        self.texts_filename = f"{cfg.memory_index}.texts"
+        self.vectors_filename = f"{cfg.memory_index}.vectors.npy"
+        dtype_name = getattr(cfg, "local_memory_dtype", "float32")
+        if dtype_name not in STORAGE_DTYPES:
+            print(f"Error: Unknown LOCAL_MEMORY_DTYPE '{dtype_name}', using float32.")
+            dtype_name = "float32"
+        self.row_dtype = STORAGE_DTYPES[dtype_name]
+        self.data = CacheContent(buffer=np.empty(0, dtype=self.row_dtype))
+        self.persistent = False
+
+        json_filename = f"{cfg.memory_index}.json"
+        if os.path.exists(json_filename) and not os.path.exists(self.vectors_filename):
             try:
-                with open(self.filename, "w+b") as f:
-                    file_content = f.read()
-                    if not file_content.strip():
-                        file_content = b"{}"
-                        f.write(file_content)
-
-                    loaded = orjson.loads(file_content)
-                    self.data = CacheContent(**loaded)
-            except orjson.JSONDecodeError:
-                print(f"Error: The file '{self.filename}' is not in JSON format.")
-                self.data = CacheContent()
+                migrated = migrate_json_cache(
+                    json_filename, cfg.memory_index, self.row_dtype
+                )
+                print(f"Migrated {migrated} memories from '{json_filename}'.")
+            except (orjson.JSONDecodeError, ValueError):
+                print(f"Error: The file '{json_filename}' is not in JSON format.")
+                write_cache_files(self.texts_filename, self.vectors_filename, self.data)
+
+        if os.path.exists(self.vectors_filename):
+            self.persistent = True
+            self._load()
         else:
             print(
-                f"Warning: The file '{self.filename}' does not exist. "
+                f"Warning: The file '{self.vectors_filename}' does not exist. "
                 "Local memory would not be saved to a file."
             )
-            self.data = CacheContent()
+
+    def _load(self) -> None:
+        """Map the vector file and read the text log, dropping any torn tail"""
+        header_rows, row_dtype = read_vectors_header(self.vectors_filename)
+        if row_dtype != self.row_dtype:
+            stored_as = next(k for k, v in STORAGE_DTYPES.items() if v == row_dtype)
+            print(
+                f"Warning: '{self.vectors_filename}' stores {stored_as} embeddings, "
+                "ignoring LOCAL_MEMORY_DTYPE for this index."
+            )
+            self.row_dtype = row_dtype
+        stored_rows = (
+            os.path.getsize(self.vectors_filename) - VECTORS_HEADER_SIZE
+        ) // row_dtype.itemsize
+        texts, texts_end = read_texts(self.texts_filename, header_rows)
+        rows = min(len(texts), header_rows, stored_rows)
+        self.data = CacheContent(texts[:rows], rows=rows)
+        self._map_vectors(max(stored_rows, MIN_CAPACITY))
+
+        if rows < header_rows or texts_end != os.path.getsize(self.texts_filename):
+            self.compact()
+
+    def _map_vectors(self, capacity: int) -> None:
+        """Map `capacity` rows of the vector file, growing the file if needed
+
+        Rows past the committed count form the append region that new memories
+        are written into. Searches only ever see a read-only view of the
+        committed rows, and every process mapping the same index shares the OS
+        page cache.
+        """
+        self.data.buffer = create_default_embeddings()
+        self.data.buffer = np.memmap(
+            self.vectors_filename,
+            dtype=self.row_dtype,
+            mode="r+",
+            offset=VECTORS_HEADER_SIZE,
+            shape=(capacity,),
+        )
+
+    def _reserve(self, rows: int) -> None:
+        """Make room for `rows` embeddings, doubling the buffer when it is full"""
+        capacity = len(self.data.buffer)
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity, MIN_CAPACITY)
+        if self.persistent:
+            self._map_vectors(capacity)
+            return
+        buffer = np.empty(capacity, dtype=self.row_dtype)
+        buffer[: self.data.rows] = self.data.buffer[: self.data.rows]
+        self.data.buffer = buffer
+
+    def compact(self) -> None:
+        """Rewrite the cache files so they hold exactly the in-memory content"""
+        if not self.persistent:
+            return
+        rows = self.data.rows
+        data = CacheContent(self.data.texts, np.array(self.data.buffer[:rows]), rows)
+        self.data.buffer = create_default_embeddings()
+        write_cache_files(self.texts_filename, self.vectors_filename, data)
+        self.data = CacheContent(data.texts, rows=rows)
+        self._map_vectors(max(2 * rows, MIN_CAPACITY))
+
+    def _store(self, texts: List[str], vectors: np.ndarray) -> None:
+        """Append memories to the buffer and, when persistent, to the files
+
+        On disk the rows are only committed once the header row count is
+        bumped, after both the texts and the vectors have been written.
+        """
+        start = self.data.rows
+        end = start + len(texts)
+        self._reserve(end)
+        self.data.buffer[start:end] = quantize(vectors, self.row_dtype)
+        if self.persistent:
+            with open(self.texts_filename, "ab") as f:
+                for text in texts:
+                    record = text.encode("utf-8")
+                    f.write(TEXT_LENGTH.pack(len(record)) + record)
+            with open(self.vectors_filename, "r+b") as f:
+                f.write(vectors_header(end, self.row_dtype))
+        self.data.texts.extend(texts)
+        self.data.rows = end
 
     def add(self, text: str):
         """
@@ -71,32 +345,37 @@ class LocalCache(MemoryProviderSingleton):
         """
         if "Command Error:" in text:
             return ""
-        self.data.texts.append(text)
 
         embedding = create_embedding_with_ada(text)
 
         vector = np.array(embedding).astype(np.float32)
-        vector = vector[np.newaxis, :]
-        self.data.embeddings = np.concatenate(
-            [
-                self.data.embeddings,
-                vector,
-            ],
-            axis=0,
-        )
-
-        with open(self.filename, "wb") as f:
-            out = orjson.dumps(self.data, option=SAVE_OPTIONS)
-            f.write(out)
+        self._store([text], vector[np.newaxis, :])
         return text
 
+    def add_many(self, texts: List[str]) -> List[str]:
+        """
+        Add several texts at once, committing them in batches of ADD_BATCH_SIZE
+
+        Args:
+            texts: List[str]
+
+        Returns: The texts that were added
+        """
+        texts = [text for text in texts if "Command Error:" not in text]
+        for start in range(0, len(texts), ADD_BATCH_SIZE):
+            batch = texts[start : start + ADD_BATCH_SIZE]
+            vectors = np.array(create_embeddings_batch(batch), dtype=np.float32)
+            self._store(batch, vectors)
+        return texts
+
     def clear(self) -> str:
         """
-        Clears the redis server.
+        Clears the local cache, truncating its files.
 
         Returns: A message indicating that the memory has been cleared.
         """
-        self.data = CacheContent()
+        self.data = CacheContent(buffer=np.empty(0, dtype=self.row_dtype))
+        self.compact()
         return "Obliviated"
 
     def get(self, data: str) -> list[Any] | None:
@@ -121,16 +400,38 @@ class LocalCache(MemoryProviderSingleton):
 
         Returns: List[str]
         """
-        embedding = create_embedding_with_ada(text)
+        embedding = np.array(create_embedding_with_ada(text), dtype=np.float32)
+
+        scores = score_rows(self.data.buffer[: self.data.rows], embedding[np.newaxis])[
+            0
+        ]
 
-        scores = np.dot(self.data.embeddings, embedding)
+        return [self.data.texts[i] for i in top_k_indices(scores, k)]
+
+    def get_relevant_batch(self, queries: List[str], k: int) -> List[List[str]]:
+        """
+        Get the top-k relevant texts for several queries at once. The queries
+         are embedded in a single request and scored with one matrix product.
+
+        Args:
+            queries: List[str]
+            k: int
+
+        Returns: List[List[str]], one list of texts per query
+        """
+        if not queries:
+            return []
+        query_embeddings = np.array(create_embeddings_batch(queries), dtype=np.float32)
 
-        top_k_indices = np.argsort(scores)[-k:][::-1]
+        scores = score_rows(self.data.buffer[: self.data.rows], query_embeddings)
 
-        return [self.data.texts[i] for i in top_k_indices]
+        return [
+            [self.data.texts[i] for i in indices]
+            for indices in top_k_indices(scores, k)
+        ]
 
     def get_stats(self) -> tuple[int, tuple[int, ...]]:
         """
         Returns: The stats of the local cache.
         """
-        return len(self.data.texts), self.data.embeddings.shape
+        return len(self.data.texts), (self.data.rows, EMBED_DIM)
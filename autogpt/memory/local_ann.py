@@ -0,0 +1,220 @@
+"""Approximate nearest-neighbour search on top of the local memory files"""
+from __future__ import annotations
+
+import os
+from typing import Any, List
+
+import numpy as np
+
+from autogpt.llm_utils import create_embedding_with_ada, create_embeddings_batch
+from autogpt.memory.local import (
+    EMBED_DIM,
+    LocalCache,
+    dequantize,
+    score_rows,
+    top_k_indices,
+)
+
+# Below this many memories a brute-force scan is fast enough, so no index is built
+MIN_TRAIN_ROWS = 4096
+# The index is retrained once the memory has grown by this factor since training
+RETRAIN_GROWTH = 2
+# Vectors sampled per inverted list to train the coarse quantizer
+TRAIN_POINTS_PER_LIST = 32
+KMEANS_ITERATIONS = 10
+# Rows assigned to inverted lists at a time when (re)building the index
+ASSIGN_BLOCK_ROWS = 16384
+DEFAULT_NPROBE = 16
+
+
+def train_centroids(
+    vectors: np.ndarray, nlist: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Spherical k-means: unit centroids maximizing the dot product to members
+
+    Args:
+        vectors: The float32 training vectors
+        nlist: The number of centroids
+        rng: The random generator used to pick the initial centroids
+
+    Returns:
+        The (nlist, EMBED_DIM) centroid matrix
+    """
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        labels = np.argmax(np.dot(vectors, centroids.T), axis=1)
+        order = np.argsort(labels, kind="stable")
+        clusters, starts = np.unique(labels[order], return_index=True)
+        sums = np.add.reduceat(vectors[order], starts, axis=0)
+        # Re-seed clusters that lost all their members with random vectors
+        centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+        centroids[clusters] = sums
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    return centroids
+
+
+class LocalANNMemory(LocalCache):
+    """Local memory with an inverted-file (IVF) index for sub-linear search
+
+    Memories are stored exactly like LocalCache does. On top of that, a coarse
+    quantizer (spherical k-means over a sample of the embeddings) splits the
+    memories into about sqrt(N) inverted lists; a search only scores the rows
+    of the `nprobe` lists whose centroids are closest to the query.
+    """
+
+    def __init__(self, cfg) -> None:
+        """Initialize a class instance
+
+        Args:
+            cfg: Config object
+
+        Returns:
+            None
+        """
+        self.nprobe = getattr(cfg, "local_ann_nprobe", DEFAULT_NPROBE)
+        self.index_filename = f"{cfg.memory_index}.ivf.npz"
+        self._reset_index()
+        super().__init__(cfg)
+        if self.persistent and os.path.exists(self.index_filename):
+            self._load_index()
+        self._maybe_train()
+
+    def _reset_index(self) -> None:
+        """Forget the coarse quantizer; searches fall back to a full scan"""
+        self.centroids = None
+        self.trained_rows = 0
+        # Inverted lists of the rows seen at training time, stored CSR-style:
+        # list c holds list_ids[list_offsets[c] : list_offsets[c + 1]]
+        self.list_ids = np.empty(0, dtype=np.int64)
+        self.list_offsets = np.zeros(1, dtype=np.int64)
+        # Rows added since training, per list
+        self.pending_ids: List[List[int]] = []
+
+    def _set_index(self, centroids: np.ndarray, assignments: np.ndarray) -> None:
+        """Build the inverted lists from one list assignment per row"""
+        self.centroids = centroids
+        self.trained_rows = len(assignments)
+        self.list_ids = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=len(centroids))
+        self.list_offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.pending_ids = [[] for _ in range(len(centroids))]
+
+    def _assign(self, start: int, end: int) -> np.ndarray:
+        """The nearest centroid of each stored row in [start, end)"""
+        assignments = np.empty(end - start, dtype=np.int64)
+        for block_start in range(start, end, ASSIGN_BLOCK_ROWS):
+            block_end = min(block_start + ASSIGN_BLOCK_ROWS, end)
+            scores = score_rows(self.data.buffer[block_start:block_end], self.centroids)
+            assignments[block_start - start : block_end - start] = np.argmax(
+                scores, axis=0
+            )
+        return assignments
+
+    def _load_index(self) -> None:
+        """Load the saved quantizer and list assignments, then catch up"""
+        with np.load(self.index_filename) as index:
+            centroids, assignments = index["centroids"], index["assignments"]
+        if centroids.shape[1:] != (EMBED_DIM,) or len(assignments) > self.data.rows:
+            return
+        self._set_index(centroids, assignments)
+        self._index_rows(self.trained_rows, self.data.rows)
+
+    def _save_index(self, assignments: np.ndarray) -> None:
+        if not self.persistent:
+            return
+        with open(f"{self.index_filename}.tmp", "wb") as f:
+            np.savez(f, centroids=self.centroids, assignments=assignments)
+        os.replace(f"{self.index_filename}.tmp", self.index_filename)
+
+    def _maybe_train(self) -> None:
+        """Train the index once enough memories have accumulated since last time"""
+        rows = self.data.rows
+        if rows < MIN_TRAIN_ROWS or rows < RETRAIN_GROWTH * self.trained_rows:
+            return
+        nlist = int(np.sqrt(rows))
+        rng = np.random.default_rng(rows)
+        sample_size = min(rows, TRAIN_POINTS_PER_LIST * nlist)
+        sample_ids = np.sort(rng.choice(rows, sample_size, replace=False))
+        sample = dequantize(self.data.buffer[sample_ids])
+        self.centroids = train_centroids(sample, nlist, rng)
+        assignments = self._assign(0, rows)
+        self._set_index(self.centroids, assignments)
+        self._save_index(assignments)
+
+    def _index_rows(self, start: int, end: int) -> None:
+        """Add stored rows in [start, end) to the pending part of their lists"""
+        for row, list_id in enumerate(self._assign(start, end), start):
+            self.pending_ids[list_id].append(row)
+
+    def _store(self, texts: List[str], vectors: np.ndarray) -> None:
+        start = self.data.rows
+        super()._store(texts, vectors)
+        if self.centroids is not None:
+            self._index_rows(start, self.data.rows)
+        self._maybe_train()
+
+    def _candidates(self, query: np.ndarray) -> np.ndarray:
+        """The rows in the `nprobe` lists closest to the query"""
+        probes = top_k_indices(np.dot(self.centroids, query), self.nprobe)
+        return np.concatenate(
+            [
+                self.list_ids[self.list_offsets[c] : self.list_offsets[c + 1]]
+                for c in probes
+            ]
+            + [np.array(self.pending_ids[c], dtype=np.int64) for c in probes]
+        )
+
+    def _search(self, query: np.ndarray, k: int) -> List[str]:
+        """Top-k texts for an embedded query, scanning only the probed lists"""
+        if self.centroids is None:
+            scores = score_rows(self.data.buffer[: self.data.rows], query[np.newaxis])
+            return [self.data.texts[i] for i in top_k_indices(scores[0], k)]
+        rows = self._candidates(query)
+        scores = score_rows(self.data.buffer[rows], query[np.newaxis])[0]
+        return [self.data.texts[rows[i]] for i in top_k_indices(scores, k)]
+
+    def clear(self) -> str:
+        """
+        Clears the local memory and its index.
+
+        Returns: A message indicating that the memory has been cleared.
+        """
+        self._reset_index()
+        if os.path.exists(self.index_filename):
+            os.remove(self.index_filename)
+        return super().clear()
+
+    def get_relevant(self, text: str, k: int) -> list[Any]:
+        """
+        Get the top-k relevant texts using the IVF index
+
+        Args:
+            text: str
+            k: int
+
+        Returns: List[str]
+        """
+        embedding = np.array(create_embedding_with_ada(text), dtype=np.float32)
+        return self._search(embedding, k)
+
+    def get_relevant_batch(self, queries: List[str], k: int) -> List[List[str]]:
+        """
+        Get the top-k relevant texts for several queries, embedded in one request
+
+        Args:
+            queries: List[str]
+            k: int
+
+        Returns: List[List[str]], one list of texts per query
+        """
+        if not queries:
+            return []
+        embeddings = np.array(create_embeddings_batch(queries), dtype=np.float32)
+        return [self._search(embedding, k) for embedding in embeddings]
+
+    def get_stats(self) -> tuple[int, tuple[int, ...], int]:
+        """
+        Returns: The stats of the local memory and the number of inverted lists.
+        """
+        lists = 0 if self.centroids is None else len(self.centroids)
+        return len(self.data.texts), (self.data.rows, EMBED_DIM), lists
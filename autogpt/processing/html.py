@@ -1,9 +1,40 @@
 """HTML processing functions"""
 from __future__ import annotations
 
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable
+
 from bs4 import BeautifulSoup
 from requests.compat import urljoin
 
+from autogpt.config import Config
+from autogpt.logs import logger
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+CFG = Config()
+
+# Where str.splitlines breaks lines, and runs of two spaces
+PHRASE_BREAK = re.compile(r"[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]| {2}")
+# Whitespace BeautifulSoup collapses in strings made only of it
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+WHITESPACE_PRESERVING_TAGS = {"pre", "textarea"}
+CLOSING_HTML_TAG = re.compile(r"</html\s*>", re.IGNORECASE)
+
+
+@dataclass
+class Page:
+    """The text and hyperlinks extracted from a webpage"""
+
+    text: str
+    hyperlinks: list[tuple[str, str]]
+
 
 def extract_hyperlinks(soup: BeautifulSoup, base_url: str) -> list[tuple[str, str]]:
     """Extract hyperlinks from a BeautifulSoup object
@@ -31,3 +62,116 @@ def format_hyperlinks(hyperlinks: list[tuple[str, str]]) -> list[str]:
         List[str]: The formatted hyperlinks
     """
     return [f"{link_text} ({link_url})" for link_text, link_url in hyperlinks]
+
+
+def normalize_text(text: str) -> str:
+    """Put each phrase of a text on its own line
+
+    Lines and runs of two spaces separate phrases; the phrases are stripped
+    and empty ones dropped.
+
+    Args:
+        text (str): The text to normalize
+
+    Returns:
+        str: The normalized text
+    """
+    return "\n".join(filter(None, map(str.strip, PHRASE_BREAK.split(text))))
+
+
+def extract_page(html: str, base_url: str, backend: str | None = None) -> Page:
+    """Extract the text and hyperlinks of a webpage, without scripts and styles
+
+    Args:
+        html (str): The HTML of the webpage
+        base_url (str): The URL relative links are resolved against
+        backend (str, optional): "lxml" or "html.parser". Defaults to the
+            backend set in the config. html.parser is used if lxml is missing
+            or the backend is unknown.
+
+    Returns:
+        Page: The normalized text and the hyperlinks of the webpage
+    """
+    backend = backend or CFG.html_extraction_backend
+    if backend not in EXTRACTION_BACKENDS:
+        _warn_unknown_backend(backend)
+        backend = "html.parser"
+    if lxml is None:
+        backend = "html.parser"
+    return EXTRACTION_BACKENDS[backend](html, base_url)
+
+
+@lru_cache(maxsize=None)
+def _warn_unknown_backend(backend: str) -> None:
+    logger.warn(f"Unknown HTML_EXTRACTION_BACKEND '{backend}', using html.parser.")
+
+
+def _extract_with_beautifulsoup(html: str, base_url: str) -> Page:
+    soup = BeautifulSoup(html, "html.parser")
+
+    for script in soup(["script", "style"]):
+        script.extract()
+
+    return Page(normalize_text(soup.get_text()), extract_hyperlinks(soup, base_url))
+
+
+def _extract_with_lxml(html: str, base_url: str) -> Page:
+    """Extract a page in a single walk over the tree parsed by libxml2
+
+    The strings are those BeautifulSoup would find, so the results match the
+    html.parser backend's.
+    """
+    parser = lxml.html.HTMLParser(encoding="utf-8", huge_tree=True)
+    # libxml2 drops what follows </html>, which html.parser keeps
+    html = CLOSING_HTML_TAG.sub("", html)
+    try:
+        root = lxml.html.document_fromstring(
+            html.encode("utf-8", errors="replace"), parser=parser
+        )
+    except etree.ParserError:
+        # The document is empty
+        return Page("", [])
+    etree.strip_elements(root, "script", "style", with_tail=False)
+    # Comments are not text, but the text following them is
+    etree.strip_tags(root, etree.Comment, etree.ProcessingInstruction)
+
+    strings: list[str] = []
+    hyperlinks: list[tuple[str, str] | None] = []
+    # The open links, with their index and the index of their first string
+    open_links: list[tuple[etree._Element, int, int]] = []
+    preserving = 0
+    for event, element in etree.iterwalk(root, events=("start", "end")):
+        if event == "start":
+            if element.tag in WHITESPACE_PRESERVING_TAGS:
+                preserving += 1
+            if element.tag == "a" and element.get("href") is not None:
+                open_links.append((element, len(hyperlinks), len(strings)))
+                hyperlinks.append(None)
+            if element.text:
+                strings.append(_soup_string(element.text, preserving))
+        else:
+            if element.tag in WHITESPACE_PRESERVING_TAGS:
+                preserving -= 1
+            if open_links and open_links[-1][0] is element:
+                _, index, start = open_links.pop()
+                hyperlinks[index] = (
+                    "".join(strings[start:]),
+                    urljoin(base_url, element.get("href")),
+                )
+            if element.tail:
+                strings.append(_soup_string(element.tail, preserving))
+    return Page(normalize_text("".join(strings)), hyperlinks)
+
+
+def _soup_string(string: str, preserving_whitespace: int) -> str:
+    """A string as BeautifulSoup stores it: whitespace alone becomes a single
+    newline or space, except in <pre> and <textarea>"""
+    if preserving_whitespace or string.strip(ASCII_SPACES):
+        return string
+    return "\n" if "\n" in string else " "
+
+
+EXTRACTION_BACKENDS: dict[str, Callable[[str, str], Page]] = {
+    "lxml": _extract_with_lxml,
+    "html.parser": _extract_with_beautifulsoup,
+}
@@ -1,16 +1,40 @@
 """Text processing functions"""
-from typing import Dict, Generator, Optional
+import asyncio
+import re
+from functools import lru_cache
+from typing import Dict, Generator, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
 
 import spacy
 from selenium.webdriver.remote.webdriver import WebDriver
+from spacy.language import Language
 
 from autogpt import token_counter
 from autogpt.config import Config
-from autogpt.llm_utils import create_chat_completion
+from autogpt.disk_cache import DiskCache, cache_key
+from autogpt.llm_utils import acreate_chat_completion, close_aiohttp_session
 from autogpt.memory import get_memory
+from autogpt.rate_limiter import Priority
 
 CFG = Config()
 MEMORY = get_memory(CFG)
+_summary_cache: Optional[DiskCache] = None
+# Delimits the chunk in the messages built by create_message
+QUOTES = '"""'
+# The sentencizer only needs the tokenizer of a spaCy model
+SPACY_EXCLUDED_COMPONENTS = [
+    "tok2vec",
+    "tagger",
+    "morphologizer",
+    "parser",
+    "senter",
+    "attribute_ruler",
+    "lemmatizer",
+    "ner",
+]
+# Whitespace after sentence-final punctuation, possibly closed by a quote or
+# bracket, and the position after CJK full stops
+SENTENCE_END = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"'”’)\]]))\s+|(?<=[。！？])\s*")
 
 
 def split_text(
@@ -32,41 +56,101 @@ def split_text(
         ValueError: If the text is longer than the maximum length
     """
     flatened_paragraphs = " ".join(text.split("\n"))
-    nlp = spacy.load(CFG.browse_spacy_language_model)
-    nlp.add_pipe("sentencizer")
-    doc = nlp(flatened_paragraphs)
-    sentences = [sent.text.strip() for sent in doc.sents]
-
-    current_chunk = []
-
-    for sentence in sentences:
-        message_with_additional_sentence = [
-            create_message(" ".join(current_chunk) + " " + sentence, question)
-        ]
+    sentences = split_sentences(flatened_paragraphs)
+    if not sentences:
+        return
+
+    # Each sentence is tokenized once. A chunk's tokens are the wrapper's, plus
+    # those of '"""' and its first sentence, plus " {sentence}" for the others;
+    # the tokenizer never merges tokens across the spaces joining sentences.
+    # Only the last sentence can merge with the closing '"""'.
+    overhead = (
+        token_usage_of_chunk(messages=[create_message("", question)], model=model)
+        - token_counter.count_string_tokens(QUOTES * 2, model)
+        + 1
+    )
+    inner_tokens = token_counter.count_tokens_batch(
+        [f" {sentence}" for sentence in sentences], model
+    )
+    closing_tokens = token_counter.count_tokens_batch(
+        [f" {sentence}{QUOTES}" for sentence in sentences], model
+    )
 
-        expected_token_usage = (
-            token_usage_of_chunk(messages=message_with_additional_sentence, model=model)
-            + 1
+    # The first sentence is measured after a space, like a sentence appended to
+    # an empty chunk always was
+    expected_token_usage = overhead + token_counter.count_string_tokens(
+        f"{QUOTES} {sentences[0]}{QUOTES}", model
+    )
+    if expected_token_usage <= max_length:
+        current_chunk = [sentences[0]]
+        chunk_tokens = token_counter.count_string_tokens(QUOTES + sentences[0], model)
+    else:
+        yield ""
+        current_chunk, chunk_tokens = _start_chunk(
+            sentences[0], overhead, max_length, model
         )
+
+    for i in range(1, len(sentences)):
+        expected_token_usage = overhead + chunk_tokens + closing_tokens[i]
         if expected_token_usage <= max_length:
-            current_chunk.append(sentence)
+            current_chunk.append(sentences[i])
+            chunk_tokens += inner_tokens[i]
         else:
             yield " ".join(current_chunk)
-            current_chunk = [sentence]
-            message_this_sentence_only = [
-                create_message(" ".join(current_chunk), question)
-            ]
-            expected_token_usage = (
-                token_usage_of_chunk(messages=message_this_sentence_only, model=model)
-                + 1
+            current_chunk, chunk_tokens = _start_chunk(
+                sentences[i], overhead, max_length, model
             )
-            if expected_token_usage > max_length:
-                raise ValueError(
-                    f"Sentence is too long in webpage: {expected_token_usage} tokens."
-                )
 
-    if current_chunk:
-        yield " ".join(current_chunk)
+    yield " ".join(current_chunk)
+
+
+def _start_chunk(
+    sentence: str, overhead: int, max_length: int, model: str
+) -> Tuple[List[str], int]:
+    """Start a chunk with a sentence, returning it and its tokens after the quotes
+
+    Raises:
+        ValueError: If the sentence alone does not fit in a chunk
+    """
+    expected_token_usage = overhead + token_counter.count_string_tokens(
+        f"{QUOTES}{sentence}{QUOTES}", model
+    )
+    if expected_token_usage > max_length:
+        raise ValueError(
+            f"Sentence is too long in webpage: {expected_token_usage} tokens."
+        )
+    return [sentence], token_counter.count_string_tokens(QUOTES + sentence, model)
+
+
+@lru_cache(maxsize=None)
+def load_sentencizer(model_name: str) -> Language:
+    """Load a spaCy model once per process, keeping only what splits sentences
+
+    Args:
+        model_name (str): The name of the spaCy model
+
+    Returns:
+        Language: The model's tokenizer followed by a rule-based sentencizer
+    """
+    nlp = spacy.load(model_name, exclude=SPACY_EXCLUDED_COMPONENTS)
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences with the splitter chosen in the config
+
+    Args:
+        text (str): The text to split
+
+    Returns:
+        List[str]: The sentences, stripped of surrounding whitespace
+    """
+    if CFG.browse_sentence_splitter == "regex":
+        sentences = SENTENCE_END.split(text)
+        return [sentence.strip() for sentence in sentences if sentence.strip()]
+    doc = load_sentencizer(CFG.browse_spacy_language_model)(text)
+    return [sent.text.strip() for sent in doc.sents]
 
 
 def token_usage_of_chunk(messages, model):
@@ -78,6 +162,10 @@ def summarize_text(
 ) -> str:
     """Summarize text using the OpenAI API
 
+    The chunks are summarized concurrently, at most
+    `browse_summary_concurrency` at a time, and their summaries summarized
+    again until they fit in one chunk.
+
     Args:
         url (str): The url of the text
         text (str): The text to summarize
@@ -94,51 +182,167 @@ def summarize_text(
     text_length = len(text)
     print(f"Text length: {text_length} characters")
 
-    summaries = []
+    cache = get_summary_cache()
+    if cache is not None:
+        page_key = cache_key(
+            "page", model, question, normalize_url(url), cache_key(text)
+        )
+        cached = cache.get(page_key)
+        if cached is not None:
+            print("The page is unchanged, using its cached summary")
+            return cached.decode("utf-8")
+
     chunks = list(
         split_text(
             text, max_length=CFG.browse_chunk_max_length, model=model, question=question
         ),
     )
-    scroll_ratio = 1 / len(chunks)
+    summaries, summary = asyncio.run(_summarize_chunks(chunks, question, model, driver))
 
-    for i, chunk in enumerate(chunks):
-        if driver:
-            scroll_to_percentage(driver, scroll_ratio * i)
-        print(f"Adding chunk {i + 1} / {len(chunks)} to memory")
+    print(f"Adding {len(chunks)} chunks and their summaries to memory")
+    MEMORY.add_many(
+        [
+            f"Source: {url}\n" f"Raw content part#{i + 1}: {chunk}"
+            for i, chunk in enumerate(chunks)
+        ]
+        + [
+            f"Source: {url}\n" f"Content summary part#{i + 1}: {summary}"
+            for i, summary in enumerate(summaries)
+        ]
+    )
+    if cache is not None:
+        cache.set(page_key, summary.encode("utf-8"))
+    return summary
+
+
+def get_summary_cache() -> Optional[DiskCache]:
+    """The cache of page and chunk summaries, if BROWSE_SUMMARY_CACHE is on"""
+    global _summary_cache
+    if _summary_cache is None and CFG.browse_summary_cache:
+        _summary_cache = DiskCache(
+            CFG.browse_summary_cache_file,
+            CFG.browse_summary_cache_size_mb * 2**20,
+            ttl=CFG.browse_summary_cache_ttl,
+        )
+    return _summary_cache
+
+
+def normalize_url(url: str) -> str:
+    """The URL without its fragment, a trailing slash or letter case in the
+    scheme and host, so that the same page always has the same cache key"""
+    parts = urlsplit(url.strip())
+    return urlunsplit(
+        (
+            parts.scheme.lower(),
+            parts.netloc.lower(),
+            parts.path.rstrip("/"),
+            parts.query,
+            "",
+        )
+    )
 
-        memory_to_add = f"Source: {url}\n" f"Raw content part#{i + 1}: {chunk}"
 
-        MEMORY.add(memory_to_add)
+async def _summarize_chunks(
+    chunks: List[str], question: str, model: str, driver: Optional[WebDriver]
+) -> Tuple[List[str], str]:
+    """Summarize each chunk, then reduce the summaries to a single answer
 
-        messages = [create_message(chunk, question)]
-        tokens_for_chunk = token_counter.count_message_tokens(messages, model)
-        print(
-            f"Summarizing chunk {i + 1} / {len(chunks)} of length {len(chunk)} characters, or {tokens_for_chunk} tokens"
-        )
+    Returns:
+        Tuple[List[str], str]: The summary of each chunk, and the final summary
+    """
+    semaphore = asyncio.Semaphore(max(CFG.browse_summary_concurrency, 1))
+    try:
+        summaries = await _summarize_all(chunks, question, model, semaphore, driver)
+        print(f"Summarized {len(chunks)} chunks.")
+
+        combined_summary = "\n".join(summaries)
+        # Summaries too long to answer from at once are summarized again
+        while (
+            token_usage_of_chunk([create_message(combined_summary, question)], model)
+            + 1
+            > CFG.browse_chunk_max_length
+        ):
+            parts = list(
+                split_text(
+                    combined_summary,
+                    max_length=CFG.browse_chunk_max_length,
+                    model=model,
+                    question=question,
+                )
+            )
+            if len(parts) < 2:
+                break
+            print(f"Combining {len(parts)} parts of the summaries")
+            combined_summary = "\n".join(
+                await _summarize_all(parts, question, model, semaphore)
+            )
 
-        summary = create_chat_completion(
+        messages = [create_message(combined_summary, question)]
+        summary = await acreate_chat_completion(
             model=model,
             messages=messages,
+            priority=Priority.SUMMARIZATION,
         )
-        summaries.append(summary)
-        print(
-            f"Added chunk {i + 1} summary to memory, of length {len(summary)} characters"
-        )
-
-        memory_to_add = f"Source: {url}\n" f"Content summary part#{i + 1}: {summary}"
-
-        MEMORY.add(memory_to_add)
-
-    print(f"Summarized {len(chunks)} chunks.")
-
-    combined_summary = "\n".join(summaries)
-    messages = [create_message(combined_summary, question)]
+    finally:
+        await close_aiohttp_session()
+    return summaries, summary
+
+
+async def _summarize_all(
+    chunks: List[str],
+    question: str,
+    model: str,
+    semaphore: asyncio.Semaphore,
+    driver: Optional[WebDriver] = None,
+) -> List[str]:
+    """Summarize chunks concurrently, returning the summaries in order
+
+    Chunks summarized before for the same question and model, on this page or
+    another, are answered from the summary cache.
+    """
+    if not chunks:
+        return []
+    scroll_ratio = 1 / len(chunks)
+    cache = get_summary_cache()
+    cached: Dict[str, bytes] = {}
+    if cache is not None:
+        keys = [cache_key("chunk", model, question, chunk) for chunk in chunks]
+        cached = cache.get_many(keys)
+        if cached:
+            print(f"Reusing the cached summaries of {len(cached)} chunks")
+
+    async def summarize(i: int, chunk: str) -> str:
+        if cache is not None and keys[i] in cached:
+            return cached[keys[i]].decode("utf-8")
+        async with semaphore:
+            if driver:
+                scroll_to_percentage(driver, scroll_ratio * i)
+
+            messages = [create_message(chunk, question)]
+            tokens_for_chunk = token_usage_of_chunk(messages, model)
+            print(
+                f"Summarizing chunk {i + 1} / {len(chunks)} of length {len(chunk)} characters, or {tokens_for_chunk} tokens"
+            )
+            summary = await acreate_chat_completion(
+                model=model,
+                messages=messages,
+                priority=Priority.SUMMARIZATION,
+            )
+            print(f"Summarized chunk {i + 1}, of length {len(summary)} characters")
+            return summary
 
-    return create_chat_completion(
-        model=model,
-        messages=messages,
+    summaries = await asyncio.gather(
+        *(summarize(i, chunk) for i, chunk in enumerate(chunks))
     )
+    if cache is not None:
+        cache.set_many(
+            {
+                key: summary.encode("utf-8")
+                for key, summary in zip(keys, summaries)
+                if key not in cached
+            }
+        )
+    return list(summaries)
 
 
 def scroll_to_percentage(driver: WebDriver, ratio: float) -> None:
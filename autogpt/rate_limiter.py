@@ -0,0 +1,295 @@
+"""Proactive rate limiting of OpenAI API requests"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, replace
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Any, Callable, List, Mapping, Optional, Tuple
+
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+# Shared state expires from Redis once no process has used it for this long
+REDIS_STATE_TTL = 3600
+
+
+class Priority(IntEnum):
+    """Request classes, most urgent first"""
+
+    AGENT = 0
+    SUMMARIZATION = 1
+    EMBEDDING = 2
+
+
+@dataclass
+class BucketState:
+    """The allowance left in both buckets when they were last updated"""
+
+    requests: float
+    tokens: float
+    updated: float
+    # No request may be sent before this time, as asked by the API
+    blocked_until: float = 0.0
+
+
+Update = Callable[[Optional[BucketState]], Tuple[BucketState, Any]]
+
+
+class MemoryStateStore:
+    """Bucket state private to this process"""
+
+    def __init__(self) -> None:
+        self._state: Optional[BucketState] = None
+        self._lock = threading.Lock()
+
+    def update(self, update: Update) -> Any:
+        """Atomically replace the state with update(state), returning its result"""
+        with self._lock:
+            self._state, result = update(self._state)
+            return result
+
+
+class SQLiteStateStore:
+    """Bucket state shared by the processes on this machine through SQLite"""
+
+    def __init__(self, filename: str, key: str) -> None:
+        self.key = key
+        self._lock = threading.Lock()
+        self._cnx = sqlite3.connect(
+            filename, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._cnx.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, state TEXT)"
+        )
+
+    def update(self, update: Update) -> Any:
+        """Atomically replace the state with update(state), returning its result"""
+        with self._lock:
+            # Take the write lock up front so no other process reads stale state
+            self._cnx.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._cnx.execute(
+                    "SELECT state FROM rate_limits WHERE key = ?", (self.key,)
+                ).fetchone()
+                state, result = update(
+                    BucketState(**json.loads(row[0])) if row else None
+                )
+                self._cnx.execute(
+                    "INSERT OR REPLACE INTO rate_limits (key, state) VALUES (?, ?)",
+                    (self.key, json.dumps(asdict(state))),
+                )
+                self._cnx.execute("COMMIT")
+            except BaseException:
+                self._cnx.execute("ROLLBACK")
+                raise
+            return result
+
+
+class RedisStateStore:
+    """Bucket state shared by every process connected to the same Redis server"""
+
+    def __init__(self, client, key: str) -> None:
+        self.client = client
+        self.key = key
+
+    def update(self, update: Update) -> Any:
+        """Atomically replace the state with update(state), returning its result"""
+
+        def transaction(pipe) -> Any:
+            raw = pipe.get(self.key)
+            state, result = update(BucketState(**json.loads(raw)) if raw else None)
+            pipe.multi()
+            pipe.set(self.key, json.dumps(asdict(state)), ex=REDIS_STATE_TTL)
+            return result
+
+        return self.client.transaction(transaction, self.key, value_from_callable=True)
+
+
+def create_state_store(cfg, api_key: str):
+    """The bucket state store selected by RATE_LIMIT_STORE
+
+    Processes share state only when they use the same API key.
+    """
+    key = "auto-gpt:rate-limits:" + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    if cfg.rate_limit_store == "sqlite":
+        return SQLiteStateStore(cfg.rate_limit_store_file, key)
+    if cfg.rate_limit_store == "redis":
+        import redis
+
+        client = redis.Redis(
+            host=cfg.redis_host, port=cfg.redis_port, password=cfg.redis_password
+        )
+        return RedisStateStore(client, key)
+    return MemoryStateStore()
+
+
+def parse_duration(value: str) -> float:
+    """Seconds in a rate limit reset time like "1m30s" or "250ms" """
+    return sum(
+        float(amount) * DURATION_UNITS[unit]
+        for amount, unit in DURATION_PART.findall(value)
+    )
+
+
+def parse_retry_after(value: str) -> float:
+    """Seconds to wait for a Retry-After header, given in seconds or as an
+    HTTP date; 0 if it cannot be parsed, leaving the backoff to the caller"""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class RateLimiter:
+    """Token buckets for requests per minute and tokens per minute
+
+    Each bucket holds up to one minute of allowance and refills continuously.
+    A request waits until both buckets can pay for it; waiting requests are
+    served by priority, then in arrival order, so a burst of embeddings never
+    delays the next agent step more than the limits themselves require.
+    A limit of 0 disables that bucket.
+
+    The buckets live in a state store, which other processes using the same
+    API key can share so that together they stay within the limits. Priorities
+    only order the requests of this process.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        store=None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.store = store or MemoryStateStore()
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._waiters: List[Tuple[int, int]] = []
+        self._counter = itertools.count()
+
+    def _refilled(self, state: Optional[BucketState], now: float) -> BucketState:
+        """The state brought forward to `now`; a new state starts with full buckets"""
+        if state is None:
+            return BucketState(self.requests_per_minute, self.tokens_per_minute, now)
+        elapsed = max(0.0, now - state.updated)
+        return replace(
+            state,
+            requests=min(
+                self.requests_per_minute,
+                state.requests + elapsed * self.requests_per_minute / 60,
+            ),
+            tokens=min(
+                self.tokens_per_minute,
+                state.tokens + elapsed * self.tokens_per_minute / 60,
+            ),
+            updated=now,
+        )
+
+    def _wait_time(self, state: BucketState, tokens: int) -> float:
+        """Seconds until both buckets can pay for a request of `tokens` tokens"""
+        wait = state.blocked_until - state.updated
+        if self.requests_per_minute and state.requests < 1:
+            wait = max(wait, (1 - state.requests) * 60 / self.requests_per_minute)
+        if self.tokens_per_minute and state.tokens < tokens:
+            wait = max(wait, (tokens - state.tokens) * 60 / self.tokens_per_minute)
+        return wait
+
+    def _take(self, tokens: int) -> float:
+        """Pay for a request if possible; otherwise return how long to wait"""
+
+        def update(state: Optional[BucketState]) -> Tuple[BucketState, float]:
+            state = self._refilled(state, self._clock())
+            wait = self._wait_time(state, tokens)
+            if wait <= 0:
+                state.requests -= 1
+                state.tokens -= tokens
+            return state, wait
+
+        return self.store.update(update)
+
+    def acquire(self, tokens: int, priority: Priority = Priority.AGENT) -> None:
+        """Block until a request using `tokens` tokens may be sent
+
+        Args:
+            tokens (int): The estimated tokens of the request, prompt and reply
+            priority (Priority): The class of the request
+        """
+        if self.tokens_per_minute:
+            # A request larger than the whole bucket goes through once it is full
+            tokens = min(tokens, self.tokens_per_minute)
+        with self._cond:
+            ticket = (priority, next(self._counter))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    if self._waiters[0] == ticket:
+                        wait = self._take(tokens)
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    async def aacquire(self, tokens: int, priority: Priority = Priority.AGENT) -> None:
+        """Wait like acquire without blocking the event loop"""
+        await asyncio.to_thread(self.acquire, tokens, priority)
+
+    def adjust(self, tokens: int) -> None:
+        """Charge (or refund, if negative) tokens once a request's usage is known"""
+
+        def update(state: Optional[BucketState]) -> Tuple[BucketState, None]:
+            state = self._refilled(state, self._clock())
+            state.tokens = min(self.tokens_per_minute, state.tokens - tokens)
+            return state, None
+
+        self.store.update(update)
+        with self._cond:
+            self._cond.notify_all()
+
+    def record_limits(self, headers: Mapping[str, str]) -> None:
+        """Align the buckets with the rate limit headers of an API response
+
+        The remaining allowance reported by the API caps the buckets, and a
+        `retry-after` pauses every process sharing the state.
+        """
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        pause = 0.0
+        if headers.get("retry-after"):
+            pause = parse_retry_after(headers["retry-after"])
+        else:
+            if remaining_requests == "0":
+                reset = headers.get("x-ratelimit-reset-requests", "")
+                pause = max(pause, parse_duration(reset))
+            if remaining_tokens == "0":
+                reset = headers.get("x-ratelimit-reset-tokens", "")
+                pause = max(pause, parse_duration(reset))
+
+        def update(state: Optional[BucketState]) -> Tuple[BucketState, None]:
+            state = self._refilled(state, self._clock())
+            if remaining_requests is not None:
+                state.requests = min(state.requests, float(remaining_requests))
+            if remaining_tokens is not None:
+                state.tokens = min(state.tokens, float(remaining_tokens))
+            state.blocked_until = max(state.blocked_until, state.updated + pause)
+            return state, None
+
+        self.store.update(update)
@@ -1,6 +1,7 @@
 """Functions for counting the number of tokens in a message or string."""
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import List
 
 import tiktoken
@@ -8,6 +9,39 @@ import tiktoken
 from autogpt.logs import logger
 from autogpt.types.openai import Message
 
+# Models whose token accounting may change over time, and the snapshot assumed
+MODEL_ALIASES = {
+    # !Note: gpt-3.5-turbo may change over time.
+    "gpt-3.5-turbo": "gpt-3.5-turbo-0301",
+    # !Note: gpt-4 may change over time.
+    "gpt-4": "gpt-4-0314",
+}
+# Tokens added per message and per name, by model
+MESSAGE_OVERHEAD = {
+    # every message follows <|start|>{role/name}\n{content}<|end|>\n
+    # if there's a name, the role is omitted
+    "gpt-3.5-turbo-0301": (4, -1),
+    "gpt-4-0314": (3, 1),
+}
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """
+    Returns the encoding of a model, resolved once per model name.
+
+    Args:
+        model (str): The name of the model.
+
+    Returns:
+        tiktoken.Encoding: The model's encoding, or cl100k_base for unknown models.
+    """
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        logger.warn("Warning: model not found. Using cl100k_base encoding.")
+        return tiktoken.get_encoding("cl100k_base")
+
 
 def count_message_tokens(
     messages: List[Message], model: str = "gpt-3.5-turbo-0301"
@@ -24,32 +58,15 @@ def count_message_tokens(
     Returns:
         int: The number of tokens used by the list of messages.
     """
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        logger.warn("Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    if model == "gpt-3.5-turbo":
-        # !Note: gpt-3.5-turbo may change over time.
-        # Returning num tokens assuming gpt-3.5-turbo-0301.")
-        return count_message_tokens(messages, model="gpt-3.5-turbo-0301")
-    elif model == "gpt-4":
-        # !Note: gpt-4 may change over time. Returning num tokens assuming gpt-4-0314.")
-        return count_message_tokens(messages, model="gpt-4-0314")
-    elif model == "gpt-3.5-turbo-0301":
-        tokens_per_message = (
-            4  # every message follows <|start|>{role/name}\n{content}<|end|>\n
-        )
-        tokens_per_name = -1  # if there's a name, the role is omitted
-    elif model == "gpt-4-0314":
-        tokens_per_message = 3
-        tokens_per_name = 1
-    else:
+    model = MODEL_ALIASES.get(model, model)
+    if model not in MESSAGE_OVERHEAD:
         raise NotImplementedError(
             f"num_tokens_from_messages() is not implemented for model {model}.\n"
             " See https://github.com/openai/openai-python/blob/main/chatml.md for"
             " information on how messages are converted to tokens."
         )
+    tokens_per_message, tokens_per_name = MESSAGE_OVERHEAD[model]
+    encoding = get_encoding(model)
     num_tokens = 0
     for message in messages:
         num_tokens += tokens_per_message
@@ -72,5 +89,24 @@ def count_string_tokens(string: str, model_name: str) -> int:
     Returns:
         int: The number of tokens in the text string.
     """
-    encoding = tiktoken.encoding_for_model(model_name)
-    return len(encoding.encode(string))
+    return len(get_encoding(model_name).encode(string))
+
+
+def count_tokens_batch(
+    strings: List[str], model_name: str, num_threads: int = 8
+) -> List[int]:
+    """
+    Returns the number of tokens in each of several text strings.
+
+    The strings are encoded in parallel by tiktoken's native threads.
+
+    Args:
+        strings (list): The text strings.
+        model_name (str): The name of the encoding to use. (e.g., "gpt-3.5-turbo")
+        num_threads (int): The number of threads to encode with. Defaults to 8.
+
+    Returns:
+        list: The number of tokens in each text string, in the same order.
+    """
+    encoded = get_encoding(model_name).encode_batch(strings, num_threads=num_threads)
+    return [len(tokens) for tokens in encoded]
@@ -0,0 +1,56 @@
+"""Compare the HTML extraction backends on a corpus of saved pages.
+
+Reports the throughput of each backend and how many pages the lxml backend
+extracts exactly like the html.parser (BeautifulSoup) backend.
+
+    python -m benchmark.benchmark_html_extraction --pages 'saved_pages/**/*.html'
+"""
+import argparse
+import glob
+import os
+import time
+
+from autogpt.processing.html import EXTRACTION_BACKENDS, extract_page
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="+", required=True)
+    parser.add_argument("--base-url", default="https://example.com/")
+    parser.add_argument("--show-differences", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = {}
+    for pattern in args.pages:
+        for path in glob.glob(pattern, recursive=True):
+            if os.path.isfile(path):
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    pages[path] = f.read()
+    size = sum(len(html.encode("utf-8")) for html in pages.values())
+    print(f"pages: {len(pages)}, size: {size / 1e6:.1f} MB")
+
+    results = {}
+    for backend in EXTRACTION_BACKENDS:
+        start = time.perf_counter()
+        results[backend] = {
+            path: extract_page(html, args.base_url, backend=backend)
+            for path, html in pages.items()
+        }
+        elapsed = time.perf_counter() - start
+        print(f"{backend:12} {size / elapsed / 1e6:7.2f} MB/s {elapsed:8.2f} s")
+
+    expected, actual = results["html.parser"], results["lxml"]
+    same_text = [path for path in pages if expected[path].text == actual[path].text]
+    same_links = [
+        path for path in pages if expected[path].hyperlinks == actual[path].hyperlinks
+    ]
+    print(f"identical text:  {len(same_text)} / {len(pages)}")
+    print(f"identical links: {len(same_links)} / {len(pages)}")
+    for path in [path for path in pages if path not in same_text][
+        : args.show_differences
+    ]:
+        print(f"text differs: {path}")
+
+
+if __name__ == "__main__":
+    main()
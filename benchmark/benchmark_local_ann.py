@@ -0,0 +1,62 @@
+"""Compare brute-force LocalCache search with the local_ann IVF index.
+
+Reports the index build time, the search latency of both backends and the
+recall@k of local_ann against the exact results.
+
+    python -m benchmark.benchmark_local_ann --entries 1000000
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from autogpt.config.singleton import Singleton
+from autogpt.memory.local import LocalCache, score_rows, top_k_indices
+from autogpt.memory.local_ann import LocalANNMemory
+from benchmark.benchmark_local_memory_dtypes import recall_at_k, synthetic_embeddings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=16)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = synthetic_embeddings(args.entries + args.queries, rng)
+    vectors, queries = vectors[: args.entries], vectors[args.entries :]
+    texts = [str(i) for i in range(args.entries)]
+    cfg = SimpleNamespace(
+        memory_index="benchmark-no-file", local_ann_nprobe=args.nprobe
+    )
+
+    exact = LocalCache(cfg)
+    exact._store(texts, vectors)
+    start = time.perf_counter()
+    expected = []
+    for query in queries:
+        scores = score_rows(exact.data.buffer[: exact.data.rows], query[np.newaxis])
+        expected.append([texts[i] for i in top_k_indices(scores[0], args.k)])
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    Singleton._instances.pop(LocalCache, None)
+
+    start = time.perf_counter()
+    ann = LocalANNMemory(cfg)
+    ann._store(texts, vectors)
+    build_s = time.perf_counter() - start
+    start = time.perf_counter()
+    results = [ann._search(query, args.k) for query in queries]
+    ann_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    print(f"entries: {args.entries}, inverted lists: {len(ann.centroids)}")
+    print(f"index build: {build_s:.1f} s")
+    print(f"brute force: {exact_ms:.2f} ms/query")
+    print(f"local_ann:   {ann_ms:.2f} ms/query")
+    print(f"recall@{args.k}:   {recall_at_k(expected, results):.3f}")
+
+
+if __name__ == "__main__":
+    main()
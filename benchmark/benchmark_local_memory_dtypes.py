@@ -0,0 +1,88 @@
+"""Compare LocalCache storage dtypes on synthetic ada-like embeddings.
+
+For each LOCAL_MEMORY_DTYPE this reports the memory footprint, the search
+latency and the recall@k of the top-k results against float32 search.
+
+    python benchmark/benchmark_local_memory_dtypes.py --entries 200000
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from autogpt.config.singleton import Singleton
+from autogpt.memory.local import (
+    EMBED_DIM,
+    STORAGE_DTYPES,
+    LocalCache,
+    score_rows,
+    top_k_indices,
+)
+
+
+def synthetic_embeddings(count: int, rng: np.random.Generator) -> np.ndarray:
+    """Unit vectors clustered around a shared direction, like ada embeddings"""
+    shared = rng.standard_normal(EMBED_DIM).astype(np.float32)
+    centers = rng.standard_normal((64, EMBED_DIM)).astype(np.float32)
+    vectors = np.empty((count, EMBED_DIM), dtype=np.float32)
+    for start in range(0, count, 10000):
+        end = min(start + 10000, count)
+        labels = rng.integers(0, len(centers), end - start)
+        noise = rng.standard_normal((end - start, EMBED_DIM)).astype(np.float32)
+        vectors[start:end] = 4 * shared + 2 * centers[labels] + noise
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def build_cache(dtype_name: str, vectors: np.ndarray) -> LocalCache:
+    """An in-memory LocalCache holding `vectors` stored as `dtype_name`"""
+    Singleton._instances.pop(LocalCache, None)
+    cache = LocalCache(
+        SimpleNamespace(memory_index="benchmark-no-file", local_memory_dtype=dtype_name)
+    )
+    cache._store([str(i) for i in range(len(vectors))], vectors)
+    return cache
+
+
+def search(cache: LocalCache, queries: np.ndarray, k: int) -> list[list[str]]:
+    """Top-k texts for each query vector, bypassing the embedding API"""
+    scores = score_rows(cache.data.buffer[: cache.data.rows], queries)
+    return [
+        [cache.data.texts[i] for i in indices] for indices in top_k_indices(scores, k)
+    ]
+
+
+def recall_at_k(expected: list[list[str]], actual: list[list[str]]) -> float:
+    """Fraction of the float32 top-k results also found by another dtype"""
+    hits = sum(len(set(e) & set(a)) for e, a in zip(expected, actual))
+    return hits / sum(len(e) for e in expected)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = synthetic_embeddings(args.entries + args.queries, rng)
+    vectors, queries = vectors[: args.entries], vectors[args.entries :]
+
+    expected = None
+    print(f"{'dtype':>8} {'MB':>9} {'ms/query':>9} {'recall@' + str(args.k):>10}")
+    for dtype_name in STORAGE_DTYPES:
+        cache = build_cache(dtype_name, vectors)
+        start = time.perf_counter()
+        results = search(cache, queries, args.k)
+        elapsed = (time.perf_counter() - start) * 1000 / len(queries)
+        if expected is None:
+            expected = results
+        megabytes = cache.data.buffer[: cache.data.rows].nbytes / 2**20
+        recall = recall_at_k(expected, results)
+        print(f"{dtype_name:>8} {megabytes:>9.1f} {elapsed:>9.2f} {recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
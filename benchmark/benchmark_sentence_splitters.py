@@ -0,0 +1,90 @@
+"""Compare the sentence splitters used to chunk scraped pages.
+
+Reports the throughput of loading the spaCy model on every call (as
+split_text used to), of the cached spaCy sentencizer and of the regex
+splitter, on saved pages or on a synthetic page.
+
+    python -m benchmark.benchmark_sentence_splitters --pages page1.txt page2.txt
+"""
+import argparse
+import random
+import time
+from typing import Callable, List
+
+import spacy
+
+from autogpt.processing.text import SENTENCE_END, load_sentencizer
+
+
+def synthetic_page(characters: int, rng: random.Random) -> str:
+    words = ["the", "agent", "reads", "a", "page", "about", "GPT-4", "3.5", "today,"]
+    sentences = []
+    while sum(map(len, sentences)) < characters:
+        sentence = " ".join(rng.choices(words, k=rng.randint(4, 30)))
+        sentences.append(sentence.capitalize() + rng.choice([".", "!", "?", '."']))
+    return " ".join(sentences)
+
+
+def split_with_reload(model: str) -> Callable[[str], List[str]]:
+    def split(text: str) -> List[str]:
+        nlp = spacy.load(model)
+        nlp.add_pipe("sentencizer")
+        return [sent.text.strip() for sent in nlp(text).sents]
+
+    return split
+
+
+def split_with_cached_model(model: str) -> Callable[[str], List[str]]:
+    def split(text: str) -> List[str]:
+        return [sent.text.strip() for sent in load_sentencizer(model)(text).sents]
+
+    return split
+
+
+def split_with_regex(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_END.split(text) if sentence]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="*", default=[])
+    parser.add_argument("--characters", type=int, default=500000)
+    parser.add_argument("--model", default="en_core_web_sm")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = []
+        for path in args.pages:
+            with open(path, encoding="utf-8") as f:
+                pages.append(" ".join(f.read().split("\n")))
+    else:
+        pages = [synthetic_page(args.characters, random.Random(0))]
+    characters = sum(map(len, pages))
+    print(f"pages: {len(pages)}, characters: {characters}")
+
+    splitters = {"regex": split_with_regex}
+    try:
+        load_sentencizer(args.model)
+    except OSError:
+        print(f"spaCy model {args.model} is not installed, timing regex only")
+    else:
+        splitters = {
+            "spacy, loaded per call": split_with_reload(args.model),
+            "spacy, cached": split_with_cached_model(args.model),
+            **splitters,
+        }
+
+    for name, split in splitters.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            sentences = sum(len(split(page)) for page in pages)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(
+            f"{name:24} {characters / elapsed / 1e6:8.2f} MB/s"
+            f" {elapsed * 1000:9.1f} ms, {sentences} sentences"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -24,7 +24,7 @@ def ingest_directory(directory, memory, args):
     Ingest all files in a directory by calling the ingest_file function for each file.
 
     :param directory: The directory containing the files to ingest
-    :param memory: An object with an add() method to store the chunks in memory
+    :param memory: An object with an add_many() method to store the chunks in memory
     """
     try:
         files = search_files(directory)
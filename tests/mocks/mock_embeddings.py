@@ -0,0 +1,10 @@
+import numpy as np
+
+from autogpt.memory.local import EMBED_DIM
+
+
+def fake_embedding(text: str) -> list:
+    """Deterministic unit vector derived from the text"""
+    rng = np.random.default_rng(abs(hash(text)) % 2**32)
+    vector = rng.standard_normal(EMBED_DIM).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
@@ -1,7 +1,13 @@
 import unittest
+from unittest.mock import MagicMock, patch
 
 import tests.context
-from autogpt.token_counter import count_message_tokens, count_string_tokens
+from autogpt.token_counter import (
+    count_message_tokens,
+    count_string_tokens,
+    count_tokens_batch,
+    get_encoding,
+)
 
 
 class TestTokenCounter(unittest.TestCase):
@@ -58,6 +64,34 @@ class TestTokenCounter(unittest.TestCase):
         string = "Hello, world!"
         self.assertEqual(count_string_tokens(string, model_name="gpt-4-0314"), 4)
 
+    @patch("tiktoken.encoding_for_model")
+    def test_encoding_is_resolved_once_per_model(self, encoding_for_model):
+        encoding = encoding_for_model.return_value
+        encoding.encode.side_effect = lambda text: text.split()
+        get_encoding.cache_clear()
+        messages = [{"role": "user", "content": "Hello there"}]
+        try:
+            for _ in range(3):
+                self.assertEqual(count_message_tokens(messages, "gpt-3.5-turbo"), 10)
+                self.assertEqual(count_string_tokens("a b c", "gpt-3.5-turbo-0301"), 3)
+        finally:
+            get_encoding.cache_clear()
+        encoding_for_model.assert_called_once_with("gpt-3.5-turbo-0301")
+
+    @patch("tiktoken.encoding_for_model")
+    def test_count_tokens_batch(self, encoding_for_model):
+        encoding = MagicMock()
+        encoding.encode_batch.side_effect = lambda texts, num_threads: [
+            text.split() for text in texts
+        ]
+        encoding_for_model.return_value = encoding
+        get_encoding.cache_clear()
+        try:
+            counts = count_tokens_batch(["a b", "", "c d e"], "gpt-4-0314")
+        finally:
+            get_encoding.cache_clear()
+        self.assertEqual(counts, [2, 0, 3])
+
 
 if __name__ == "__main__":
     unittest.main()
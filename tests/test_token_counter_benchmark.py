@@ -0,0 +1,73 @@
+"""Microbenchmarks of token counting, before and after caching the encodings
+
+    pytest tests/test_token_counter_benchmark.py --benchmark-columns=ops,mean
+"""
+import pytest
+import tiktoken
+
+from autogpt.token_counter import (
+    count_message_tokens,
+    count_string_tokens,
+    count_tokens_batch,
+)
+
+try:
+    tiktoken.get_encoding("cl100k_base")
+except Exception:  # The encodings are downloaded on first use
+    pytest.skip("tiktoken encodings are not available", allow_module_level=True)
+
+MESSAGES = [
+    {"role": "system", "content": "You are Entrepreneur-GPT. " * 20},
+    {"role": "user", "content": "Determine which next command to use."},
+    {"role": "assistant", "content": '{"command": {"name": "google"}}'},
+]
+STRINGS = [f"Chunk {i} of a scraped web page. " * 50 for i in range(64)]
+
+
+def uncached_count_message_tokens(messages, model="gpt-3.5-turbo"):
+    """count_message_tokens as it was: the encoding is looked up on every call,
+    and once more when recursing for the model alias"""
+    encoding = tiktoken.encoding_for_model(model)
+    if model == "gpt-3.5-turbo":
+        return uncached_count_message_tokens(messages, model="gpt-3.5-turbo-0301")
+    num_tokens = 0
+    for message in messages:
+        num_tokens += 4
+        for key, value in message.items():
+            num_tokens += len(encoding.encode(value))
+            if key == "name":
+                num_tokens -= 1
+    return num_tokens + 3
+
+
+@pytest.mark.benchmark(group="count_message_tokens")
+def test_count_message_tokens_before(benchmark):
+    assert benchmark(uncached_count_message_tokens, MESSAGES) == count_message_tokens(
+        MESSAGES, "gpt-3.5-turbo"
+    )
+
+
+@pytest.mark.benchmark(group="count_message_tokens")
+def test_count_message_tokens_after(benchmark):
+    benchmark(count_message_tokens, MESSAGES, "gpt-3.5-turbo")
+
+
+@pytest.mark.benchmark(group="count_tokens")
+def test_count_string_tokens_before(benchmark):
+    def count_all():
+        return [
+            len(tiktoken.encoding_for_model("gpt-3.5-turbo").encode(string))
+            for string in STRINGS
+        ]
+
+    assert benchmark(count_all) == count_tokens_batch(STRINGS, "gpt-3.5-turbo")
+
+
+@pytest.mark.benchmark(group="count_tokens")
+def test_count_string_tokens_after(benchmark):
+    benchmark(lambda: [count_string_tokens(s, "gpt-3.5-turbo") for s in STRINGS])
+
+
+@pytest.mark.benchmark(group="count_tokens")
+def test_count_tokens_batch(benchmark):
+    benchmark(count_tokens_batch, STRINGS, "gpt-3.5-turbo")
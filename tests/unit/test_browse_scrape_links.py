@@ -2,8 +2,11 @@
 
 # Dependencies:
 # pip install pytest-mock
+from collections import OrderedDict
+
 import pytest
 
+from autogpt.commands import web_requests
 from autogpt.commands.web_requests import scrape_links
 
 """
@@ -37,6 +40,12 @@ requests and parse HTML content, respectively.
 """
 
 
+@pytest.fixture(autouse=True)
+def page_cache(mocker):
+    """Pages extracted by a test are not served to the next one"""
+    mocker.patch.object(web_requests, "_pages", OrderedDict())
+
+
 class TestScrapeLinks:
     # Tests that the function returns a list of formatted hyperlinks when
     # provided with a valid url that returns a webpage with hyperlinks.
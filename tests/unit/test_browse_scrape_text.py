@@ -1,7 +1,11 @@
 # Generated by CodiumAI
 
+from collections import OrderedDict
+
+import pytest
 import requests
 
+from autogpt.commands import web_requests
 from autogpt.commands.web_requests import scrape_text
 
 """
@@ -40,6 +44,12 @@ Additional aspects:
 """
 
 
+@pytest.fixture(autouse=True)
+def page_cache(mocker):
+    """Pages extracted by a test are not served to the next one"""
+    mocker.patch.object(web_requests, "_pages", OrderedDict())
+
+
 class TestScrapeText:
     # Tests that scrape_text() returns the expected text when given a valid URL.
     def test_scrape_text_with_valid_url(self, mocker):
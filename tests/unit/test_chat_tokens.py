@@ -0,0 +1,92 @@
+"""Unit tests for the token accounting of chat_with_ai's context"""
+import pytest
+
+from autogpt import chat
+from autogpt.chat import (
+    HistoryTokens,
+    count_context_tokens,
+    create_chat_message,
+    fit_relevant_memory,
+    generate_context,
+)
+
+
+def fake_count_message_tokens(messages, model):
+    """Like the real counter for gpt-3.5-turbo-0301, with one token per word"""
+    return (
+        sum(4 + len(m["role"].split()) + len(m["content"].split()) for m in messages)
+        + 3
+    )
+
+
+@pytest.fixture
+def count_tokens(mocker):
+    chat._message_tokens.cache_clear()
+    return mocker.patch(
+        "autogpt.token_counter.count_message_tokens",
+        side_effect=fake_count_message_tokens,
+    )
+
+
+def history(length):
+    return [
+        create_chat_message("user" if i % 2 else "assistant", "word " * (i % 7 + 1))
+        for i in range(length)
+    ]
+
+
+def test_context_tokens_match_count_message_tokens(count_tokens):
+    messages = history(5)
+    assert count_context_tokens(messages, "model") == fake_count_message_tokens(
+        messages, "model"
+    )
+    assert count_context_tokens([], "model") == 3
+
+
+def test_history_fit_matches_message_by_message_walk(count_tokens):
+    messages = history(40)
+    tokens = HistoryTokens("model")
+    tokens.update(messages)
+
+    for budget in range(-5, 400, 7):
+        # The loop chat_with_ai used to run, from the newest message backwards
+        start, used = len(messages), 0
+        while start > 0:
+            cost = fake_count_message_tokens([messages[start - 1]], "model")
+            if used + cost > budget:
+                break
+            used += cost
+            start -= 1
+        assert tokens.fit(budget) == start
+        assert tokens.total(start) == used
+
+
+def test_history_messages_are_tokenized_once(count_tokens):
+    messages = history(10)
+    tokens = HistoryTokens("model")
+    tokens.update(messages)
+    messages.extend(history(3))
+    tokens.update(messages)
+    tokens.update(messages)
+
+    assert count_tokens.call_count == len({str(m) for m in messages})
+    assert tokens.total(0) == sum(
+        fake_count_message_tokens([m], "model") for m in messages
+    )
+
+    replaced = history(4)
+    tokens.update(replaced)
+    assert tokens.total(0) == sum(
+        fake_count_message_tokens([m], "model") for m in replaced
+    )
+
+
+def test_fit_relevant_memory_drops_the_fewest_memories(count_tokens):
+    memories = [f"memory number {i} " + "word " * i for i in range(30)]
+    for max_tokens in (10, 60, 200, 400, 10000):
+        expected = memories
+        while generate_context("prompt", expected, [], "model")[1] > max_tokens:
+            if not expected:
+                break
+            expected = expected[:-1]
+        assert fit_relevant_memory("prompt", memories, "model", max_tokens) == expected
@@ -0,0 +1,103 @@
+"""Unit tests for the SQLite disk cache and the embedding cache built on it"""
+import sqlite3
+
+import pytest
+
+from autogpt import llm_utils
+from autogpt.disk_cache import DiskCache
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+def test_values_persist_and_are_counted(cache_file):
+    cache = DiskCache(cache_file, max_bytes=1000)
+    cache.set("a", b"first")
+    assert cache.get("a") == b"first"
+    assert cache.get("b") is None
+
+    reopened = DiskCache(cache_file, max_bytes=1000)
+    assert reopened.get_many(["a", "b", "a"]) == {"a": b"first"}
+    assert reopened.stats() == {"hits": 1, "misses": 1, "bytes": 5}
+
+
+def test_least_recently_used_entries_are_evicted(cache_file, mocker):
+    clock = mocker.patch("autogpt.disk_cache.time.time", return_value=0)
+    cache = DiskCache(cache_file, max_bytes=30)
+    for i, key in enumerate("abc"):
+        clock.return_value = i
+        cache.set(key, b"x" * 10)
+    clock.return_value = 3
+    cache.get("a")
+
+    clock.return_value = 4
+    cache.set("d", b"x" * 10)
+
+    assert set(cache.get_many("abcd")) == {"a", "d"}
+    assert cache.stats()["bytes"] == 20
+
+
+def test_eviction_counts_values_stored_by_other_connections(cache_file):
+    first = DiskCache(cache_file, max_bytes=30)
+    second = DiskCache(cache_file, max_bytes=30)
+    first.set("a", b"x" * 10)
+    second.set("b", b"x" * 10)
+    first.set("c", b"x" * 10)
+    assert first.stats()["bytes"] == second.stats()["bytes"] == 30
+
+    second.set("d", b"x" * 10)
+
+    assert first.get("a") is None
+    assert first.stats()["bytes"] == 20
+
+
+def test_locked_databases_miss_instead_of_failing(cache_file):
+    cache = DiskCache(cache_file, max_bytes=1000)
+    cache.set("a", b"value")
+    cache._cnx.execute("PRAGMA busy_timeout = 0")
+    other = sqlite3.connect(cache_file)
+    other.execute("BEGIN EXCLUSIVE")
+
+    assert cache.get("a") is None
+    cache.set("b", b"value")
+
+    other.rollback()
+    assert cache.get_many(["a", "b"]) == {"a": b"value"}
+    assert cache.stats()["bytes"] == 5
+
+
+def test_expired_entries_are_missing(cache_file, mocker):
+    clock = mocker.patch("autogpt.disk_cache.time.time", return_value=0)
+    cache = DiskCache(cache_file, max_bytes=1000, ttl=60)
+    cache.set("a", b"value")
+
+    clock.return_value = 61
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_embeddings_are_requested_once(cache_file, mocker):
+    mocker.patch.object(
+        llm_utils, "_embedding_cache", DiskCache(cache_file, max_bytes=2**20)
+    )
+    request = mocker.patch.object(
+        llm_utils,
+        "_request_embeddings",
+        side_effect=lambda texts: [[float(len(text)), 0.5] for text in texts],
+    )
+
+    assert llm_utils.create_embeddings_batch(["one", "three"]) == [
+        [3.0, 0.5],
+        [5.0, 0.5],
+    ]
+    assert llm_utils.create_embeddings_batch(["three ", "a  b", "a\nb"]) == [
+        [5.0, 0.5],
+        [4.0, 0.5],
+        [4.0, 0.5],
+    ]
+    assert llm_utils.create_embedding_with_ada("one") == [3.0, 0.5]
+
+    assert [c.args[0] for c in request.call_args_list] == [["one", "three"], ["a  b"]]
+    assert llm_utils.get_embedding_cache().stats()["hits"] == 2
@@ -0,0 +1,62 @@
+"""Unit tests for extracting the text and links of webpages"""
+import pytest
+
+from autogpt.config import Config
+from autogpt.processing.html import extract_page, normalize_text
+
+PAGES = [
+    "",
+    "   \n ",
+    "<p>Hello <b>world</b>!</p>",
+    "<html><head><title>Title</title><style>p {}</style></head>"
+    "<body><script>var x = '<p>';</script>\n  <p>Text</p>\n\t<p>More  text</p>"
+    "</body></html>",
+    "<ul><li><!-- note --> item one\n</li><li><?pi?>item two</li></ul>",
+    "<pre>  keep\n   indented  </pre> <textarea>\n\n</textarea><p> \n </p>",
+    "<p>Caf&eacute; &amp; &nbsp;bar&#8212;baz</p>",
+    "<a href='/a'>A <b>bold</b> link</a> <a name='anchor'>no href</a>"
+    "<a href=''>empty</a><a href='https://example.org/b?x=1#y'>B</a>",
+    "<p>Unclosed <a href='c'>link</p> after",
+    "<html><body><p>x</p></body></html>\n<p>After the end</p>",
+    "<div>Line one<br>Line two\r\nLine three Line four</div>",
+    "<!DOCTYPE html><body><p>a<script>skip</script>b</p><noscript>no js</noscript>",
+]
+
+
+@pytest.mark.parametrize("html", PAGES)
+def test_backends_agree(html):
+    lxml_page = extract_page(html, "https://example.com/dir/", backend="lxml")
+    soup_page = extract_page(html, "https://example.com/dir/", backend="html.parser")
+
+    assert lxml_page == soup_page
+
+
+def test_text_and_links():
+    page = extract_page(PAGES[3] + PAGES[7], "https://example.com/dir/")
+
+    assert page.text == "Title\nText\nMore\ntextA bold link no hrefemptyB"
+    assert page.hyperlinks == [
+        ("A bold link", "https://example.com/a"),
+        ("empty", "https://example.com/dir/"),
+        ("B", "https://example.org/b?x=1#y"),
+    ]
+
+
+def test_unknown_backend_falls_back_to_html_parser(mocker):
+    warn = mocker.patch("autogpt.processing.html.logger.warn")
+    mocker.patch.object(Config(), "html_extraction_backend", "lmxl")
+    html = "<p>Text <a href='/a'>link</a></p>"
+
+    for _ in range(2):
+        assert extract_page(html, "https://example.com/") == extract_page(
+            html, "https://example.com/", backend="html.parser"
+        )
+    warn.assert_called_once()
+
+
+def test_normalize_text():
+    text = "  a  b   c \n\n d\te \r\n\x0cf    g"
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+
+    assert normalize_text(text) == "\n".join(chunk for chunk in chunks if chunk)
@@ -0,0 +1,144 @@
+"""Unit tests for the HTTP cache and the parsed pages shared by the scrapers"""
+from collections import OrderedDict
+
+import pytest
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from autogpt.commands import web_requests
+from autogpt.disk_cache import DiskCache
+from autogpt.http_cache import HTTPCache
+
+URL = "https://example.com/page"
+PAGE = b"<html><body><p>Hello</p>\n<a href='/next'>Next</a></body></html>"
+
+
+def make_response(status_code=200, content=PAGE, **headers):
+    response = Response()
+    response.status_code = status_code
+    response.url = URL
+    response.encoding = "utf-8"
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    return response
+
+
+@pytest.fixture
+def session(mocker):
+    return mocker.Mock()
+
+
+@pytest.fixture
+def http_cache(tmp_path):
+    return HTTPCache(DiskCache(tmp_path / "http_cache", 2**20), default_ttl=60)
+
+
+@pytest.fixture
+def clock(mocker):
+    now = [1000.0]
+    mocker.patch("autogpt.http_cache.time.time", side_effect=lambda: now[0])
+    return now
+
+
+def test_fresh_responses_are_served_from_the_cache(session, http_cache, clock):
+    session.get.return_value = make_response(**{"Cache-Control": "max-age=100"})
+
+    assert http_cache.get(session, URL, 10).content == PAGE
+    clock[0] += 99
+    cached = http_cache.get(session, URL, 10)
+
+    assert session.get.call_count == 1
+    assert cached.status_code == 200
+    assert cached.text == PAGE.decode()
+    assert cached.headers["cache-control"] == "max-age=100"
+
+
+def test_stale_responses_are_revalidated(session, http_cache, clock):
+    session.get.return_value = make_response(
+        ETag='"v1"', **{"Last-Modified": "Mon, 01 May 2023 00:00:00 GMT"}
+    )
+    http_cache.get(session, URL, 10)
+
+    clock[0] += 61
+    session.get.return_value = make_response(304, b"")
+    assert http_cache.get(session, URL, 10).content == PAGE
+    assert session.get.call_args.kwargs["headers"] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 May 2023 00:00:00 GMT",
+    }
+
+    # The 304 made the entry fresh again
+    assert http_cache.get(session, URL, 10).content == PAGE
+    assert session.get.call_count == 2
+
+    clock[0] += 61
+    session.get.return_value = make_response(content=b"changed", ETag='"v2"')
+    assert http_cache.get(session, URL, 10).content == b"changed"
+    assert http_cache.get(session, URL, 10).content == b"changed"
+    assert session.get.call_count == 3
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [{"Cache-Control": "no-store"}, {"Vary": "*"}, {"Cache-Control": "no-cache"}],
+)
+def test_uncacheable_responses_are_fetched_again(session, http_cache, headers):
+    session.get.return_value = make_response(**headers)
+
+    http_cache.get(session, URL, 10)
+    http_cache.get(session, URL, 10)
+
+    assert session.get.call_count == 2
+
+
+def test_errors_are_not_cached(session, http_cache):
+    session.get.return_value = make_response(500, b"error")
+
+    http_cache.get(session, URL, 10)
+    http_cache.get(session, URL, 10)
+
+    assert session.get.call_count == 2
+
+
+def test_expires_header(session, http_cache, clock):
+    session.get.return_value = make_response(
+        Date="Mon, 01 May 2023 00:00:00 GMT", Expires="Mon, 01 May 2023 00:00:30 GMT"
+    )
+    http_cache.get(session, URL, 10)
+
+    clock[0] += 29
+    http_cache.get(session, URL, 10)
+    assert session.get.call_count == 1
+    clock[0] += 2
+    http_cache.get(session, URL, 10)
+    assert session.get.call_count == 2
+
+
+def test_text_and_links_share_one_fetch_and_parse(mocker, http_cache):
+    mocker.patch.object(web_requests, "_http_cache", http_cache)
+    mocker.patch.object(web_requests, "_pages", OrderedDict())
+    get = mocker.patch.object(web_requests.session, "get", return_value=make_response())
+    parse = mocker.spy(web_requests, "extract_page")
+
+    assert web_requests.scrape_text(URL) == "Hello\nNext"
+    assert web_requests.scrape_links(URL) == ["Next (https://example.com/next)"]
+
+    get.assert_called_once()
+    parse.assert_called_once()
+
+
+def test_pages_are_fetched_once_without_the_http_cache(mocker):
+    mocker.patch.object(web_requests, "_http_cache", None)
+    mocker.patch.object(web_requests.CFG, "http_cache", False)
+    mocker.patch.object(web_requests, "_pages", OrderedDict())
+    get = mocker.patch.object(web_requests.session, "get", return_value=make_response())
+    now = [0.0]
+    mocker.patch.object(web_requests.time, "monotonic", side_effect=lambda: now[0])
+
+    assert web_requests.scrape_text(URL) == "Hello\nNext"
+    assert web_requests.scrape_links(URL) == ["Next (https://example.com/next)"]
+    assert get.call_count == 1
+
+    now[0] += web_requests.PAGE_CACHE_TTL
+    web_requests.scrape_text(URL)
+    assert get.call_count == 2
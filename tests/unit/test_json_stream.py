@@ -0,0 +1,89 @@
+"""Unit tests for incremental JSON parsing of streamed replies"""
+import json
+
+from autogpt.json_utils.json_stream import IncrementalJSONParser
+from autogpt.logs import StreamedThoughtsPrinter
+
+REPLY = {
+    "command": {"name": "google", "args": {"input": 'say "}" {['}},
+    "thoughts": {
+        "text": "thought",
+        "reasoning": "reasoning",
+        "plan": ["- short", "- list"],
+        "criticism": "criticism",
+        "speak": "speak",
+    },
+}
+
+
+def parse_in_pieces(text, size):
+    events = []
+    parser = IncrementalJSONParser(lambda path, value: events.append((path, value)))
+    for start in range(0, len(text), size):
+        parser.feed(text[start : start + size])
+    return parser, events
+
+
+def test_values_are_reported_as_they_close():
+    text = "Here you go:\n" + json.dumps(REPLY, indent=4) + "\nAnything else?"
+    for size in (1, 7, len(text)):
+        parser, events = parse_in_pieces(text, size)
+
+        assert parser.done
+        assert parser.value == REPLY
+        paths = [path for path, _ in events]
+        assert paths.index(("command",)) < paths.index(("thoughts", "text"))
+        assert ("command", "args") in paths
+        assert ("command", "args", "input") not in paths
+        assert dict(events)[("thoughts", "plan")] == ["- short", "- list"]
+        assert events[-1] == ((), REPLY)
+
+
+def test_scalars_and_invalid_json():
+    parser, events = parse_in_pieces('{"a": 1.5, "b": [true, null], "c": bad}', 3)
+
+    assert (("a",), 1.5) in events
+    assert (("b", 0), True) in events
+    assert (("b", 1), None) in events
+    assert parser.done
+    assert parser.value is None
+
+
+def test_printer_prints_each_thought_once(mocker):
+    printed = mocker.patch("autogpt.logs.print_assistant_thought")
+    started = mocker.Mock()
+    printer = StreamedThoughtsPrinter("Agent", on_first_output=started)
+    reply = dict(REPLY, thoughts={"text": "thought", "plan": "- a"})
+    text = json.dumps(reply)
+
+    stopped = [printer.feed(text[i : i + 5]) for i in range(0, len(text), 5)]
+
+    assert stopped[-1] and not any(stopped[:-1])
+    started.assert_called_once()
+    printer.finish(reply)
+    assert [c.args[1] for c in printed.call_args_list] == [
+        "text",
+        "plan",
+        "reasoning",
+        "criticism",
+        "speak",
+    ]
+
+
+def test_printer_starts_over_on_a_new_attempt(mocker):
+    printed = mocker.patch("autogpt.logs.print_assistant_thought")
+    printer = StreamedThoughtsPrinter("Agent")
+    failed = json.dumps(dict(REPLY, thoughts={"text": "first"}))
+    reply = dict(REPLY, thoughts={"text": "second", "plan": "- a"})
+
+    printer.feed(failed[: failed.index("first") + 8])
+    printer.reset()
+    assert printer.feed(json.dumps(reply))
+    printer.finish(reply)
+
+    assert [c.args[1:] for c in printed.call_args_list[:3]] == [
+        ("text", "first"),
+        ("text", "second"),
+        ("plan", "- a"),
+    ]
+    assert len(printed.call_args_list) == 6
@@ -0,0 +1,202 @@
+"""Unit tests for batched and asynchronous API requests"""
+import threading
+
+import openai
+import pytest
+from openai.error import APIError, RateLimitError
+
+from autogpt import llm_utils
+from autogpt.disk_cache import DiskCache
+
+
+@pytest.fixture
+def request_batch(mocker):
+    mocker.patch.object(llm_utils, "_embedding_cache", None)
+    mocker.patch.object(llm_utils.CFG, "embedding_cache", False)
+    mocker.patch.object(
+        llm_utils,
+        "count_tokens_batch",
+        side_effect=lambda texts, model: [len(text) for text in texts],
+    )
+    return mocker.patch.object(
+        llm_utils,
+        "_request_embeddings_batch",
+        side_effect=lambda texts: [[float(len(text))] for text in texts],
+    )
+
+
+def test_requests_respect_input_and_token_limits(request_batch, mocker):
+    mocker.patch.object(llm_utils, "EMBEDDING_MAX_INPUTS", 3)
+    mocker.patch.object(llm_utils, "EMBEDDING_MAX_TOKENS_PER_REQUEST", 10)
+    texts = ["a", "b", "c", "d", "eeeeeeee", "ffff", "gggggggggggg"]
+
+    embeddings = llm_utils.create_embeddings_batch(texts)
+
+    assert embeddings == [[float(len(text))] for text in texts]
+    assert [c.args[0] for c in request_batch.call_args_list] == [
+        ["a", "b", "c"],
+        ["d", "eeeeeeee"],
+        ["ffff"],
+        ["gggggggggggg"],
+    ]
+
+
+def test_coalescer_batches_concurrent_requests(request_batch):
+    coalescer = llm_utils.EmbeddingCoalescer(window=0.05)
+    texts = [str(i) * (i + 1) for i in range(8)]
+    results = {}
+
+    def embed(text):
+        results[text] = coalescer.embed(text)
+
+    threads = [threading.Thread(target=embed, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {text: [float(len(text))] for text in texts}
+    assert request_batch.call_count == 1
+    assert sorted(request_batch.call_args.args[0]) == sorted(texts)
+
+
+def test_coalescer_propagates_errors(request_batch):
+    request_batch.side_effect = RuntimeError("API down")
+    coalescer = llm_utils.EmbeddingCoalescer(window=0.001)
+
+    with pytest.raises(RuntimeError, match="API down"):
+        coalescer.embed("text")
+
+
+def chat_response(content):
+    return openai.openai_object.OpenAIObject.construct_from(
+        {"choices": [{"message": {"content": content}}]}
+    )
+
+
+@pytest.mark.asyncio
+async def test_acreate_chat_completion_retries_rate_limits(mocker):
+    mocker.patch.object(llm_utils.CFG, "plugins", [])
+    mocker.patch.object(llm_utils.CFG, "use_azure", False)
+    mocker.patch.object(llm_utils.logger, "double_check")
+    sleep = mocker.patch("autogpt.llm_utils.asyncio.sleep")
+    acreate = mocker.patch(
+        "openai.ChatCompletion.acreate",
+        side_effect=[RateLimitError("slow down"), chat_response("hi")],
+    )
+    messages = [{"role": "user", "content": "hello"}]
+
+    reply = await llm_utils.acreate_chat_completion(messages, model="gpt-4")
+
+    assert reply == "hi"
+    assert acreate.call_count == 2
+    assert acreate.call_args.kwargs["messages"] == messages
+    sleep.assert_awaited_once_with(4)
+    await llm_utils.close_aiohttp_session()
+
+
+@pytest.mark.asyncio
+async def test_acreate_embedding_uses_pooled_session(mocker):
+    mocker.patch.object(llm_utils, "_embedding_cache", None)
+    mocker.patch.object(llm_utils.CFG, "embedding_cache", False)
+    mocker.patch.object(llm_utils.CFG, "use_azure", False)
+    mocker.patch.object(llm_utils, "count_tokens_batch", return_value=[1])
+    sessions = []
+
+    async def acreate(**kwargs):
+        sessions.append(openai.aiosession.get())
+        return {"data": [{"index": 0, "embedding": [0.5]}]}
+
+    mocker.patch("openai.Embedding.acreate", side_effect=acreate)
+
+    assert await llm_utils.acreate_embedding("text") == [0.5]
+    assert await llm_utils.acreate_embedding("text") == [0.5]
+
+    assert sessions[0] is sessions[1] is llm_utils.get_aiohttp_session()
+    assert openai.aiosession.get() is None
+    await llm_utils.close_aiohttp_session()
+
+
+@pytest.fixture
+def response_cache(tmp_path, mocker):
+    mocker.patch.object(llm_utils.CFG, "plugins", [])
+    mocker.patch.object(llm_utils.CFG, "use_azure", False)
+    cache = DiskCache(str(tmp_path / "responses.sqlite3"), max_bytes=2**20)
+    mocker.patch.object(llm_utils, "_response_cache", cache)
+    return cache
+
+
+def test_deterministic_chat_completions_are_cached(response_cache, mocker):
+    create = mocker.patch(
+        "openai.ChatCompletion.create", side_effect=lambda **_: chat_response("hi")
+    )
+    messages = [{"role": "user", "content": "hello"}]
+
+    for _ in range(2):
+        assert llm_utils.create_chat_completion(messages, "gpt-4", 0) == "hi"
+    llm_utils.create_chat_completion(messages, "gpt-4", 0, max_tokens=10)
+    llm_utils.create_chat_completion(messages, "gpt-4", 0.7)
+    llm_utils.create_chat_completion(messages, "gpt-4", 0.7)
+
+    assert create.call_count == 4
+    assert response_cache.stats()["hits"] == 1
+
+
+def test_streamed_chat_completion_stops_when_asked(response_cache, mocker):
+    pieces = ['{"a"', ": 1}", " and more", " text"]
+    closed = []
+
+    def stream(**_):
+        try:
+            yield {"choices": [{"delta": {"role": "assistant"}}]}
+            for piece in pieces:
+                yield {"choices": [{"delta": {"content": piece}}]}
+        finally:
+            closed.append(True)
+
+    create = mocker.patch("openai.ChatCompletion.create", side_effect=stream)
+    received = []
+
+    def on_token(piece):
+        received.append(piece)
+        return "}" in piece
+
+    messages = [{"role": "user", "content": "hello"}]
+    for _ in range(2):
+        reply = llm_utils.create_chat_completion(
+            messages, "gpt-4", 0, on_token=on_token
+        )
+        assert reply == '{"a": 1}'
+
+    assert received == pieces[:2] * 2
+    assert closed == [True, True]
+    assert create.call_args.kwargs["stream"] is True
+    # Replies cut short are not cached
+    assert create.call_count == 2
+
+
+def test_each_streaming_attempt_starts_over(mocker):
+    mocker.patch.object(llm_utils.CFG, "plugins", [])
+    mocker.patch.object(llm_utils.CFG, "use_azure", False)
+    mocker.patch.object(llm_utils.time, "sleep")
+    attempts = []
+
+    def stream(**_):
+        attempts.append(True)
+        yield {"choices": [{"delta": {"content": "partial"}}]}
+        if len(attempts) == 1:
+            raise APIError("Bad gateway", http_status=502)
+        yield {"choices": [{"delta": {"content": " reply"}}]}
+
+    mocker.patch("openai.ChatCompletion.create", side_effect=stream)
+    received = []
+
+    reply = llm_utils.create_chat_completion(
+        [{"role": "user", "content": "hello"}],
+        "gpt-4",
+        on_token=received.append,
+        on_stream_start=received.clear,
+    )
+
+    assert reply == "partial reply"
+    assert received == ["partial", " reply"]
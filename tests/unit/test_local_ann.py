@@ -0,0 +1,72 @@
+"""Unit tests for the local_ann memory backend"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from autogpt.config.singleton import Singleton
+from autogpt.memory.local_ann import LocalANNMemory
+from tests.mocks.mock_embeddings import fake_embedding
+
+
+@pytest.fixture
+def memory_index(tmp_path, mocker):
+    for module in ("local", "local_ann"):
+        mocker.patch(
+            f"autogpt.memory.{module}.create_embedding_with_ada",
+            side_effect=fake_embedding,
+        )
+        mocker.patch(
+            f"autogpt.memory.{module}.create_embeddings_batch",
+            side_effect=lambda texts: [fake_embedding(text) for text in texts],
+        )
+    mocker.patch("autogpt.memory.local_ann.MIN_TRAIN_ROWS", 256)
+    return str(tmp_path / "auto-gpt")
+
+
+def open_memory(memory_index: str) -> LocalANNMemory:
+    """Create a fresh LocalANNMemory, bypassing the singleton instance cache"""
+    Singleton._instances.pop(LocalANNMemory, None)
+    return LocalANNMemory(SimpleNamespace(memory_index=memory_index))
+
+
+def test_searches_without_index_below_threshold(memory_index):
+    memory = open_memory(memory_index)
+    memory.add_many([f"memory {i}" for i in range(10)])
+
+    assert memory.centroids is None
+    assert memory.get_relevant("memory 7", 1) == ["memory 7"]
+
+
+def test_index_is_trained_and_extended_incrementally(memory_index):
+    memory = open_memory(memory_index)
+    memory.add_many([f"memory {i}" for i in range(300)])
+    assert memory.centroids is not None
+    assert memory.trained_rows == 300
+
+    memory.add("a late memory")
+    assert memory.trained_rows == 300
+    assert memory.get_relevant("a late memory", 1) == ["a late memory"]
+    assert memory.get_relevant_batch(["memory 3", "memory 250"], 1) == [
+        ["memory 3"],
+        ["memory 250"],
+    ]
+
+    memory.add_many([f"more {i}" for i in range(300)])
+    assert memory.trained_rows == 601
+
+
+def test_index_is_persisted(memory_index, mocker):
+    open(f"{memory_index}.json", "w").close()
+    memory = open_memory(memory_index)
+    memory.add_many([f"memory {i}" for i in range(300)])
+    memory.add("after training")
+
+    train = mocker.patch("autogpt.memory.local_ann.train_centroids")
+    reopened = open_memory(memory_index)
+    train.assert_not_called()
+    np.testing.assert_array_equal(reopened.centroids, memory.centroids)
+    assert reopened.get_relevant("after training", 1) == ["after training"]
+
+    reopened.clear()
+    assert open_memory(memory_index).centroids is None
@@ -0,0 +1,137 @@
+"""Unit tests for the LocalCache on-disk format"""
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import orjson
+import pytest
+
+from autogpt.config.singleton import Singleton
+from autogpt.memory.local import EMBED_DIM, LocalCache
+from tests.mocks.mock_embeddings import fake_embedding
+
+
+@pytest.fixture
+def memory_index(tmp_path, mocker):
+    mocker.patch(
+        "autogpt.memory.local.create_embedding_with_ada", side_effect=fake_embedding
+    )
+    mocker.patch(
+        "autogpt.memory.local.create_embeddings_batch",
+        side_effect=lambda texts: [fake_embedding(text) for text in texts],
+    )
+    return str(tmp_path / "auto-gpt")
+
+
+def open_cache(memory_index: str, dtype: str = "float32") -> LocalCache:
+    """Create a fresh LocalCache, bypassing the singleton instance cache"""
+    Singleton._instances.pop(LocalCache, None)
+    return LocalCache(
+        SimpleNamespace(memory_index=memory_index, local_memory_dtype=dtype)
+    )
+
+
+def test_add_persists_across_instances(memory_index):
+    open(f"{memory_index}.json", "w").close()
+    cache = open_cache(memory_index)
+    cache.add("first memory")
+    cache.add("second memory")
+
+    reopened = open_cache(memory_index)
+    assert reopened.data.texts == ["first memory", "second memory"]
+    assert reopened.get_relevant("second memory", 1) == ["second memory"]
+
+
+def test_torn_tail_is_discarded(memory_index):
+    open(f"{memory_index}.json", "w").close()
+    cache = open_cache(memory_index)
+    cache.add("committed")
+    with open(cache.texts_filename, "ab") as f:
+        f.write(b"\x10\x00\x00\x00half")
+    with open(cache.vectors_filename, "ab") as f:
+        f.write(b"\x00" * 100)
+
+    reopened = open_cache(memory_index)
+    assert reopened.data.texts == ["committed"]
+    assert reopened.data.embeddings.shape == (1, EMBED_DIM)
+    reopened.add("after crash")
+    assert open_cache(memory_index).data.texts == ["committed", "after crash"]
+
+
+def test_migrates_json_file(memory_index):
+    texts = ["old memory", "another old memory"]
+    embeddings = [fake_embedding(text) for text in texts]
+    with open(f"{memory_index}.json", "wb") as f:
+        f.write(orjson.dumps({"texts": texts, "embeddings": embeddings}))
+
+    cache = open_cache(memory_index)
+    assert cache.data.texts == texts
+    np.testing.assert_allclose(cache.data.embeddings, embeddings, rtol=1e-6)
+    assert os.path.exists(f"{memory_index}.json.bak")
+    assert not os.path.exists(f"{memory_index}.json")
+
+
+def test_embeddings_are_memory_mapped(memory_index):
+    open(f"{memory_index}.json", "w").close()
+    cache = open_cache(memory_index)
+    for i in range(3):
+        cache.add(f"memory {i}")
+
+    reopened = open_cache(memory_index)
+    assert isinstance(reopened.data.embeddings.base, np.memmap)
+    assert not reopened.data.embeddings.flags.writeable
+    np.testing.assert_array_equal(reopened.data.embeddings, cache.data.embeddings)
+
+
+def test_clear_truncates_files(memory_index):
+    open(f"{memory_index}.json", "w").close()
+    cache = open_cache(memory_index)
+    cache.add("forget me")
+    cache.clear()
+
+    assert open_cache(memory_index).data.texts == []
+
+
+def test_add_many_grows_buffer_geometrically(memory_index):
+    cache = open_cache(memory_index)
+    texts = [f"chunk {i}" for i in range(1500)]
+    capacities = set()
+    for start in range(0, len(texts), 100):
+        cache.add_many(texts[start : start + 100])
+        capacities.add(len(cache.data.buffer))
+
+    assert cache.data.texts == texts
+    assert cache.data.embeddings.shape == (1500, EMBED_DIM)
+    assert capacities == {1024, 2048}
+    assert cache.get_relevant("chunk 1234", 1) == ["chunk 1234"]
+
+
+def test_get_relevant_batch_matches_get_relevant(memory_index):
+    cache = open_cache(memory_index)
+    cache.add_many([f"memory {i}" for i in range(50)])
+    queries = ["memory 3", "memory 42", "memory 17"]
+
+    results = cache.get_relevant_batch(queries, 5)
+
+    assert results == [cache.get_relevant(query, 5) for query in queries]
+    assert [result[0] for result in results] == queries
+    assert cache.get_relevant_batch(queries, 100)[0][0] == "memory 3"
+    assert len(cache.get_relevant_batch(queries, 100)[0]) == 50
+
+
+@pytest.mark.parametrize("dtype, row_bytes", [("float16", 3072), ("int8", 1540)])
+def test_quantized_storage(memory_index, dtype, row_bytes):
+    open(f"{memory_index}.json", "w").close()
+    cache = open_cache(memory_index, dtype)
+    texts = [f"memory {i}" for i in range(20)]
+    cache.add_many(texts)
+
+    reopened = open_cache(memory_index, "float32")
+    assert reopened.row_dtype.itemsize == row_bytes
+    assert reopened.data.embeddings.shape == (20, EMBED_DIM)
+    np.testing.assert_allclose(
+        reopened.data.embeddings,
+        [fake_embedding(text) for text in texts],
+        atol=2e-3,
+    )
+    assert reopened.get_relevant_batch(texts[:5], 1) == [[text] for text in texts[:5]]
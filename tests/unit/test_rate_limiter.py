@@ -0,0 +1,102 @@
+"""Unit tests for the token-bucket rate limiter"""
+import threading
+import time
+
+from autogpt.rate_limiter import (
+    Priority,
+    RateLimiter,
+    SQLiteStateStore,
+    parse_duration,
+    parse_retry_after,
+)
+
+
+def test_requests_wait_for_tokens_to_refill():
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=6000)
+    start = time.monotonic()
+    limiter.acquire(6000)
+    assert time.monotonic() - start < 0.1
+
+    limiter.acquire(30)
+    assert time.monotonic() - start >= 0.25
+
+
+def test_requests_per_minute_are_limited():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=0)
+    start = time.monotonic()
+    for _ in range(602):
+        limiter.acquire(1000)
+    assert 0.15 <= time.monotonic() - start < 1
+
+
+def test_higher_priority_requests_go_first():
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=6000)
+    limiter.acquire(6000)
+    order = []
+
+    def request(priority):
+        limiter.acquire(20, priority)
+        order.append(priority)
+
+    threads = []
+    for priority in (Priority.EMBEDDING, Priority.SUMMARIZATION, Priority.AGENT):
+        threads.append(threading.Thread(target=request, args=(priority,)))
+        threads[-1].start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join()
+
+    assert order == [Priority.AGENT, Priority.SUMMARIZATION, Priority.EMBEDDING]
+
+
+def test_adjust_refunds_overestimated_tokens():
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=6000)
+    limiter.acquire(6000)
+    limiter.adjust(-3000)
+
+    start = time.monotonic()
+    limiter.acquire(3000)
+    assert time.monotonic() - start < 0.1
+
+
+def test_processes_share_buckets_through_sqlite(tmp_path):
+    filename = str(tmp_path / "rate_limits.sqlite3")
+    first = RateLimiter(0, 6000, store=SQLiteStateStore(filename, "key"))
+    second = RateLimiter(0, 6000, store=SQLiteStateStore(filename, "key"))
+    other_key = RateLimiter(0, 6000, store=SQLiteStateStore(filename, "other"))
+    first.acquire(6000)
+
+    start = time.monotonic()
+    other_key.acquire(6000)
+    assert time.monotonic() - start < 0.1
+    second.acquire(30)
+    assert time.monotonic() - start >= 0.25
+
+
+def test_retry_after_pauses_all_requests(tmp_path):
+    store = SQLiteStateStore(str(tmp_path / "rate_limits.sqlite3"), "key")
+    limiter = RateLimiter(requests_per_minute=3500, tokens_per_minute=0, store=store)
+    RateLimiter(3500, 0, store=store).record_limits(
+        {"retry-after": "0.3", "x-ratelimit-remaining-requests": "10"}
+    )
+
+    start = time.monotonic()
+    limiter.acquire(1)
+    assert time.monotonic() - start >= 0.25
+
+
+def test_parse_duration():
+    assert parse_duration("6m0s") == 360
+    assert parse_duration("1.5s") == 1.5
+    assert parse_duration("20ms") == 0.02
+
+
+def test_parse_retry_after(mocker):
+    mocker.patch(
+        "autogpt.rate_limiter.time.time",
+        return_value=1682899200.0,  # Mon, 01 May 2023 00:00:00 GMT
+    )
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("Mon, 01 May 2023 00:00:30 GMT") == 30
+    assert parse_retry_after("Sun, 30 Apr 2023 00:00:00 GMT") == 0
+    assert parse_retry_after("soon") == 0
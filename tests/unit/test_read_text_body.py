@@ -0,0 +1,142 @@
+"""Unit tests for the size cap and content type checks of fetched pages"""
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from autogpt.commands import web_requests
+from autogpt.commands.web_requests import (
+    STREAMED_TEXT,
+    get_response,
+    read_text_body,
+    session,
+)
+
+
+class CountingStream(io.BytesIO):
+    """A raw body counting how many of its bytes are read"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def make_response(body, status_code=200, **headers):
+    response = Response()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response.raw = CountingStream(body)
+    return response
+
+
+@pytest.fixture
+def max_bytes(mocker):
+    mocker.patch.object(web_requests.CFG, "http_max_bytes", 100_000)
+    return 100_000
+
+
+def test_bodies_are_truncated_while_streaming(max_bytes):
+    response = make_response(b"<p>" + b"a" * 10**7, **{"Content-Type": "text/html"})
+
+    read_text_body(response)
+
+    assert response.content == b"<p>" + b"a" * (max_bytes - 3)
+    assert response.raw.bytes_read < max_bytes + web_requests.CHUNK_SIZE
+
+
+@pytest.mark.parametrize(
+    "content_type, body",
+    [
+        ("image/png", b"\x89PNG\r\n"),
+        ("application/pdf; qs=0.001", b"%PDF-1.7"),
+        ("", b"%PDF-1.7"),
+        ("application/octet-stream", b"\x1f\x8b\x08\x00"),
+        ("", b"some\x00binary"),
+    ],
+)
+def test_binary_responses_are_rejected(max_bytes, content_type, body):
+    response = make_response(body * 10**5, **{"Content-Type": content_type})
+
+    with pytest.raises(ValueError, match="Unsupported content type"):
+        read_text_body(response)
+    assert response.raw.bytes_read <= web_requests.CHUNK_SIZE
+
+
+@pytest.mark.parametrize(
+    "content_type",
+    [
+        "text/html; charset=utf-8",
+        "TEXT/PLAIN",
+        "application/xhtml+xml",
+        "application/json",
+        "",
+    ],
+)
+def test_text_responses_are_read(max_bytes, content_type):
+    response = make_response(b"<p>Hello</p>", **{"Content-Type": content_type})
+
+    assert read_text_body(response).text == "<p>Hello</p>"
+
+
+def test_content_type_of_error_pages_is_not_checked(max_bytes):
+    response = make_response(b"\x89PNG", 404, **{"Content-Type": "image/png"})
+
+    assert read_text_body(response).content == b"\x89PNG"
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        content_type, size = {
+            "/huge": ("text/html", 10**7),
+            "/image": ("image/jpeg", 10**7),
+        }[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        try:
+            for _ in range(size // 10**5):
+                self.wfile.write(b"a" * 10**5)
+        except ConnectionError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_streams_and_caps_real_responses(max_bytes, server):
+    response = session.get(f"{server}/huge", timeout=10, **STREAMED_TEXT)
+    assert len(response.content) == max_bytes
+    assert list(response.iter_content(max_bytes)) == [response.content]
+
+    with pytest.raises(ValueError, match="Unsupported content type image/jpeg"):
+        session.get(f"{server}/image", timeout=10, **STREAMED_TEXT)
+
+
+def test_get_response_reports_rejected_responses(mocker):
+    mocker.patch(
+        "requests.Session.get", side_effect=ValueError("Unsupported content type x")
+    )
+
+    assert get_response("https://example.com/x") == (
+        None,
+        "Error: Unsupported content type x",
+    )
@@ -0,0 +1,81 @@
+"""Unit tests for scraping several webpages in one command"""
+import threading
+import time
+
+import pytest
+
+from autogpt.commands import web_requests
+from autogpt.commands.web_requests import scrape_many
+
+
+@pytest.fixture
+def pages(mocker):
+    """A fake scrape_text recording how many pages of each host load at once"""
+    state = {"active": {}, "max_active": {}, "max_total": 0, "delay": 0.05}
+    lock = threading.Lock()
+
+    def scrape_text(url):
+        host = url.split("/")[2]
+        with lock:
+            state["active"][host] = state["active"].get(host, 0) + 1
+            state["max_active"][host] = max(
+                state["max_active"].get(host, 0), state["active"][host]
+            )
+            state["max_total"] = max(state["max_total"], sum(state["active"].values()))
+        time.sleep(state["delay"] if "slow" not in url else 1)
+        with lock:
+            state["active"][host] -= 1
+        if "broken" in url:
+            raise ValueError("broken page")
+        return f"text of {url}"
+
+    mocker.patch.object(web_requests, "scrape_text", side_effect=scrape_text)
+    return state
+
+
+def test_pages_are_scraped_concurrently_per_host(pages):
+    urls = [f"https://a.com/{i}" for i in range(6)] + [
+        f"https://b.com/{i}" for i in range(6)
+    ]
+
+    result = scrape_many(urls, max_workers=6, max_per_host=2)
+
+    assert pages["max_active"] == {"a.com": 2, "b.com": 2}
+    assert pages["max_total"] == 4
+    assert result.split("\n\n") == [f"Text from {url}:\ntext of {url}" for url in urls]
+
+
+def test_urls_as_a_string(pages):
+    result = scrape_many("https://a.com/1, https://b.com/2 https://a.com/1")
+
+    assert result == (
+        "Text from https://a.com/1:\ntext of https://a.com/1\n\n"
+        "Text from https://b.com/2:\ntext of https://b.com/2"
+    )
+    assert scrape_many("  ") == "Error: No URLs to scrape"
+
+
+def test_errors_and_timeouts_are_reported_per_page(pages):
+    result = scrape_many(
+        ["https://a.com/slow", "https://b.com/broken", "https://c.com/ok"],
+        timeout=0.5,
+    )
+
+    assert result.split("\n\n") == [
+        "Text from https://a.com/slow:\nError: Timed out after 0.5 seconds",
+        "Text from https://b.com/broken:\nError: broken page",
+        "Text from https://c.com/ok:\ntext of https://c.com/ok",
+    ]
+
+
+def test_results_are_truncated_to_the_byte_budget(pages):
+    urls = ["https://a.com/1", "https://a.com/2", "https://a.com/3"]
+
+    result = scrape_many(urls, max_bytes=30)
+
+    truncated = "\n[Truncated: the size limit of the results was reached]"
+    assert result == (
+        "Text from https://a.com/1:\ntext of https://a.com/1\n\n"
+        f"Text from https://a.com/2:\ntext of{truncated}\n\n"
+        f"Text from https://a.com/3:\n{truncated}"
+    )
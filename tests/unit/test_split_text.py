@@ -0,0 +1,122 @@
+"""Unit tests for splitting scraped text into chunks"""
+import re
+
+import pytest
+import spacy
+
+from autogpt import token_counter
+from autogpt.config import Config
+from autogpt.processing.text import (
+    create_message,
+    load_sentencizer,
+    split_sentences,
+    split_text,
+)
+
+# Pre-tokenizes like tiktoken, then splits words into tokens of up to 4 letters
+PIECES = re.compile(r" ?[A-Za-z]+| ?[0-9]{1,3}| ?[^\sA-Za-z0-9]+|\s+(?!\S)|\s+")
+
+
+class FakeEncoding:
+    def encode(self, text):
+        return [
+            piece[i : i + 4]
+            for piece in PIECES.findall(text)
+            for i in range(0, len(piece), 4)
+        ]
+
+    def encode_batch(self, texts, num_threads=8):
+        return [self.encode(text) for text in texts]
+
+
+@pytest.fixture(autouse=True)
+def fake_tokenizer(mocker):
+    mocker.patch("autogpt.token_counter.get_encoding", return_value=FakeEncoding())
+    load_sentencizer.cache_clear()
+    yield mocker.patch(
+        "spacy.load", side_effect=lambda name, **kwargs: spacy.blank("en")
+    )
+    load_sentencizer.cache_clear()
+
+
+def split_text_quadratic(text, max_length, model, question):
+    """split_text as it was, re-tokenizing the whole chunk for each sentence"""
+    nlp = spacy.load("en")
+    nlp.add_pipe("sentencizer")
+    sentences = [sent.text.strip() for sent in nlp(" ".join(text.split("\n"))).sents]
+    current_chunk = []
+    for sentence in sentences:
+        message = create_message(" ".join(current_chunk) + " " + sentence, question)
+        if token_counter.count_message_tokens([message], model) + 1 <= max_length:
+            current_chunk.append(sentence)
+        else:
+            yield " ".join(current_chunk)
+            current_chunk = [sentence]
+            message = create_message(sentence, question)
+            if token_counter.count_message_tokens([message], model) + 1 > max_length:
+                raise ValueError("Sentence is too long in webpage")
+    if current_chunk:
+        yield " ".join(current_chunk)
+
+
+TEXT = "\n".join(
+    f'Sentence {i} says "{"word" * (i % 5 + 1)}", then ends{"." * (i % 3 + 1)}'
+    f" {i * 37} items (approx.) cost $1,{i:03}!"
+    for i in range(60)
+)
+
+
+def collect(chunks):
+    """The chunks yielded, and whether a sentence was too long"""
+    collected = []
+    try:
+        for chunk in chunks:
+            collected.append(chunk)
+    except ValueError:
+        return collected, True
+    return collected, False
+
+
+@pytest.mark.parametrize("max_length", [60, 75, 90, 120, 333, 1000, 100000])
+def test_chunks_match_quadratic_split(max_length):
+    expected = collect(split_text_quadratic(TEXT, max_length, "gpt-3.5-turbo", "q?"))
+    chunks = collect(split_text(TEXT, max_length, "gpt-3.5-turbo", "q?"))
+
+    assert chunks == expected
+
+
+def test_sentence_too_long():
+    with pytest.raises(ValueError):
+        list(split_text("Short one. " + "word " * 200, 80, "gpt-3.5-turbo", "q?"))
+    with pytest.raises(ValueError):
+        list(split_text("word " * 200, 80, "gpt-3.5-turbo", "q?"))
+
+
+def test_empty_text():
+    assert list(split_text("", 100, "gpt-3.5-turbo", "q?")) == []
+
+
+def test_spacy_model_is_loaded_once(fake_tokenizer):
+    for _ in range(3):
+        list(split_text(TEXT, 1000, "gpt-3.5-turbo", "q?"))
+
+    fake_tokenizer.assert_called_once()
+    assert "parser" in fake_tokenizer.call_args.kwargs["exclude"]
+
+
+def test_regex_splitter(mocker, fake_tokenizer):
+    mocker.patch.object(Config(), "browse_sentence_splitter", "regex")
+    text = 'Hi there.  "Who are you?" he said. (Yes.) No! 3.5 is fine。好的！ end'
+
+    assert split_sentences(text) == [
+        "Hi there.",
+        '"Who are you?"',
+        "he said.",
+        "(Yes.)",
+        "No!",
+        "3.5 is fine。",
+        "好的！",
+        "end",
+    ]
+    assert split_sentences(" ") == []
+    fake_tokenizer.assert_not_called()
@@ -0,0 +1,144 @@
+"""Unit tests for the concurrent summarization of scraped text"""
+import asyncio
+
+import pytest
+
+from autogpt.config import Config
+from autogpt.disk_cache import DiskCache
+from autogpt.processing import text
+
+
+@pytest.fixture
+def llm(mocker):
+    """A fake chat model answering "summary of <chunk>" on one line, after a
+    short delay"""
+    calls = {"active": 0, "max_active": 0, "prompts": []}
+
+    async def acreate_chat_completion(model, messages, priority):
+        chunk = messages[0]["content"].split('"""')[1]
+        calls["prompts"].append(chunk)
+        calls["active"] += 1
+        calls["max_active"] = max(calls["max_active"], calls["active"])
+        await asyncio.sleep(0.01)
+        calls["active"] -= 1
+        return "summary of " + chunk.replace("\n", " + ")
+
+    mocker.patch.object(text, "acreate_chat_completion", acreate_chat_completion)
+    mocker.patch.object(Config(), "browse_summary_concurrency", 3)
+    return calls
+
+
+@pytest.fixture
+def memory(mocker):
+    return mocker.patch.object(text, "MEMORY")
+
+
+@pytest.fixture(autouse=True)
+def summary_cache(mocker):
+    mocker.patch.object(Config(), "browse_summary_cache", False)
+    mocker.patch.object(text, "_summary_cache", None)
+
+
+def fake_split_text(chunks):
+    """split_text yielding the given chunks for the page, and the text itself
+    for the summaries"""
+
+    def split_text(content, max_length, model, question):
+        return chunks if content == "page" else [content]
+
+    return split_text
+
+
+def test_chunks_are_summarized_concurrently(mocker, llm, memory):
+    chunks = [f"chunk {i}" for i in range(10)]
+    mocker.patch.object(text, "split_text", side_effect=fake_split_text(chunks))
+    mocker.patch.object(text, "token_usage_of_chunk", return_value=10)
+
+    summary = text.summarize_text("https://example.com", "page", "question")
+
+    assert 1 < llm["max_active"] <= 3
+    assert summary == "summary of " + " + ".join(f"summary of {c}" for c in chunks)
+    memory.add_many.assert_called_once()
+    added = memory.add_many.call_args.args[0]
+    assert added[0] == "Source: https://example.com\nRaw content part#1: chunk 0"
+    assert added[-1] == (
+        "Source: https://example.com\nContent summary part#10: summary of chunk 9"
+    )
+    assert len(added) == 20
+
+
+def test_long_summaries_are_summarized_again(mocker, llm, memory):
+    chunks = [f"chunk {i}" for i in range(6)]
+
+    def split_text(content, max_length, model, question):
+        if content == "page":
+            return chunks
+        lines = content.split("\n")
+        return ["\n".join(lines[i : i + 2]) for i in range(0, len(lines), 2)]
+
+    def token_usage(messages, model):
+        return messages[0]["content"].count("\n") * 100 + 100
+
+    mocker.patch.object(text, "split_text", side_effect=split_text)
+    mocker.patch.object(text, "token_usage_of_chunk", side_effect=token_usage)
+    mocker.patch.object(Config(), "browse_chunk_max_length", 250)
+
+    summary = text.summarize_text("https://example.com", "page", "question")
+
+    # 6 chunks, 3 summaries of pairs of summaries, 2 summaries of those, 1 answer
+    assert len(llm["prompts"]) == 6 + 3 + 2 + 1
+    assert llm["prompts"][6:9] == [
+        "summary of chunk 0\nsummary of chunk 1",
+        "summary of chunk 2\nsummary of chunk 3",
+        "summary of chunk 4\nsummary of chunk 5",
+    ]
+    assert summary == (
+        "summary of summary of summary of summary of chunk 0 + summary of chunk 1"
+        " + summary of summary of chunk 2 + summary of chunk 3"
+        " + summary of summary of summary of chunk 4 + summary of chunk 5"
+    )
+    assert len(memory.add_many.call_args.args[0]) == 12
+
+
+def test_cached_summaries_are_reused(mocker, tmp_path, llm, memory):
+    mocker.patch.object(text, "_summary_cache", DiskCache(tmp_path / "cache", 2**20))
+    mocker.patch.object(text, "token_usage_of_chunk", return_value=10)
+    pages = {
+        "old page": ["chunk 0", "chunk 1", "chunk 2"],
+        "new page": ["chunk 0", "chunk 1 edited", "chunk 2"],
+    }
+    mocker.patch.object(
+        text,
+        "split_text",
+        side_effect=lambda content, **kwargs: pages.get(content, [content]),
+    )
+
+    first = text.summarize_text("https://example.com/a/", "old page", "question")
+    assert len(llm["prompts"]) == 4
+
+    # The same page, under an equivalent URL
+    assert text.summarize_text("HTTPS://Example.com/a#top", "old page", "question")
+    assert len(llm["prompts"]) == 4
+    assert text.summarize_text("https://example.com/a", "old page", "question") == first
+    assert len(llm["prompts"]) == 4
+
+    # Only the edited chunk, and the combined summaries, are summarized again
+    text.summarize_text("https://example.com/a", "new page", "question")
+    assert llm["prompts"][4:] == [
+        "chunk 1 edited",
+        "summary of chunk 0\nsummary of chunk 1 edited\nsummary of chunk 2",
+    ]
+
+    # Another question is answered from scratch
+    text.summarize_text("https://example.com/a", "new page", "other question")
+    assert len(llm["prompts"]) == 10
+
+
+def test_pages_without_chunks(mocker, llm, memory):
+    mocker.patch.object(text, "split_text", side_effect=fake_split_text([]))
+    mocker.patch.object(text, "token_usage_of_chunk", return_value=10)
+
+    assert text.summarize_text("https://example.com", "page", "question") == (
+        "summary of "
+    )
+    assert llm["prompts"] == [""]
@@ -0,0 +1,128 @@
+"""Unit tests for the browser kept open by the Playwright scrapers"""
+import threading
+
+import pytest
+
+from autogpt.commands import web_playwright
+from autogpt.commands.web_playwright import (
+    PAGES_PER_CONTEXT,
+    block_heavy_resources,
+    scrape_links,
+    scrape_text,
+)
+
+HTML = "<html><body><p>Hello</p>\n<a href='/next'>Next</a></body></html>"
+
+
+@pytest.fixture
+def playwright(mocker):
+    """A fake Playwright whose pages all have the same content"""
+    playwright = mocker.Mock()
+    browser = playwright.chromium.launch.return_value
+    browser.is_connected.return_value = True
+    browser.new_context.side_effect = lambda: mocker.Mock(
+        new_page=mocker.Mock(
+            side_effect=lambda: mocker.Mock(content=mocker.Mock(return_value=HTML))
+        )
+    )
+    sync_playwright = mocker.patch.object(
+        web_playwright, "sync_playwright", create=True
+    )
+    sync_playwright.return_value.start.return_value = playwright
+    mocker.patch.object(web_playwright, "_local", threading.local())
+    mocker.patch.object(web_playwright, "_browsers", set())
+    return playwright
+
+
+def test_text_and_links_share_one_browser_and_navigation(playwright):
+    assert scrape_text("https://example.com/a") == "Hello\nNext"
+    assert scrape_links("https://example.com/a") == ["Next (https://example.com/next)"]
+    assert scrape_text("https://example.com/b") == "Hello\nNext"
+
+    browser = playwright.chromium.launch.return_value
+    playwright.chromium.launch.assert_called_once()
+    browser.new_context.assert_called_once()
+    context = web_playwright.get_browser()._context
+    assert context.new_page.call_count == 2
+    context.route.assert_called_once_with("**/*", block_heavy_resources)
+
+
+def test_pages_are_loaded_again_once_stale(playwright, mocker):
+    now = [0.0]
+    mocker.patch.object(web_playwright.time, "monotonic", side_effect=lambda: now[0])
+
+    scrape_text("https://example.com/a")
+    now[0] += web_playwright.PAGE_CACHE_TTL
+    scrape_links("https://example.com/a")
+
+    assert web_playwright.get_browser()._context.new_page.call_count == 2
+
+
+def test_contexts_are_replaced_and_crashed_browsers_relaunched(playwright):
+    for i in range(PAGES_PER_CONTEXT + 1):
+        scrape_text(f"https://example.com/{i}")
+
+    browser = playwright.chromium.launch.return_value
+    assert browser.new_context.call_count == 2
+
+    browser.is_connected.return_value = False
+    browser.close.side_effect = RuntimeError("Target closed")
+    scrape_text("https://example.com/crashed")
+    assert playwright.chromium.launch.call_count == 2
+    # The crashed browser's Playwright driver is stopped
+    playwright.stop.assert_called_once()
+    assert len(web_playwright._browsers) == 1
+
+
+def test_failed_launches_stop_playwright(playwright):
+    playwright.chromium.launch.side_effect = RuntimeError("no chromium")
+
+    scrape_text("https://example.com/a")
+
+    playwright.stop.assert_called_once()
+
+
+def test_browsers_are_closed_on_their_own_thread(playwright, mocker):
+    warn = mocker.patch.object(web_playwright.logger, "warn")
+    browser = playwright.chromium.launch.return_value
+    closed_on = []
+    browser.close.side_effect = lambda: closed_on.append(threading.current_thread())
+
+    def scrape(close):
+        scrape_text("https://example.com/a")
+        if close:
+            web_playwright.close_browser()
+
+    for close, name in [(True, "closing"), (False, "leaking")]:
+        thread = threading.Thread(target=scrape, args=[close], name=name)
+        thread.start()
+        thread.join()
+    scrape_text("https://example.com/a")
+
+    web_playwright._close_browsers_at_exit()
+
+    assert [thread.name for thread in closed_on] == ["closing", "MainThread"]
+    assert playwright.stop.call_count == 2
+    warn.assert_called_once()
+    assert "thread leaking" in warn.call_args.args[0]
+
+
+def test_navigation_errors_are_reported(playwright):
+    playwright.chromium.launch.side_effect = RuntimeError("no chromium")
+
+    assert scrape_text("https://example.com/a") == "Error: no chromium"
+    assert scrape_links("https://example.com/a") == "Error: no chromium"
+
+
+@pytest.mark.parametrize(
+    "resource_type, aborted",
+    [("image", True), ("font", True), ("media", True), ("document", False)],
+)
+def test_heavy_resources_are_blocked(mocker, resource_type, aborted):
+    route = mocker.Mock()
+    route.request.resource_type = resource_type
+
+    block_heavy_resources(route)
+
+    assert route.abort.called == aborted
+    assert route.continue_.called != aborted
@@ -0,0 +1,120 @@
+"""Unit tests for the pool of Selenium browsers"""
+import threading
+
+import pytest
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from autogpt.commands import web_selenium
+from autogpt.commands.web_selenium import DriverPool
+
+
+@pytest.fixture
+def factory(mocker):
+    mocker.patch.object(web_selenium, "reset_driver")
+    return mocker.Mock(side_effect=lambda: mocker.Mock(name="driver"))
+
+
+def test_drivers_are_reused_and_reset(factory):
+    pool = DriverPool(size=2, max_pages=10, factory=factory)
+
+    with pool.driver() as first:
+        pass
+    with pool.driver() as second:
+        pass
+
+    assert first is second
+    factory.assert_called_once()
+    web_selenium.reset_driver.assert_called_with(first)
+    assert pool.stats() == {
+        "created": 1,
+        "reused": 1,
+        "recycled": 0,
+        "crashed": 0,
+        "idle": 1,
+        "in_use": 0,
+    }
+
+
+def test_drivers_are_recycled_after_max_pages(factory):
+    pool = DriverPool(size=1, max_pages=3, factory=factory)
+
+    drivers = []
+    for _ in range(7):
+        with pool.driver() as driver:
+            drivers.append(driver)
+
+    assert len(set(map(id, drivers))) == 3
+    assert drivers[0].quit.called and drivers[3].quit.called
+    assert not drivers[6].quit.called
+    assert pool.stats()["recycled"] == 2
+
+
+def test_crashed_drivers_are_replaced(factory):
+    pool = DriverPool(size=1, max_pages=10, factory=factory)
+
+    with pytest.raises(WebDriverException):
+        with pool.driver() as crashed:
+            raise WebDriverException("chrome not reachable")
+    with pytest.raises(ValueError):
+        with pool.driver() as failed:
+            raise ValueError("not a browser error")
+    with pool.driver() as driver:
+        pass
+
+    crashed.quit.assert_called_once()
+    assert failed is driver and failed is not crashed
+    assert pool.stats()["crashed"] == 1
+
+
+def test_page_errors_do_not_replace_drivers(factory):
+    pool = DriverPool(size=1, max_pages=10, factory=factory)
+
+    with pytest.raises(TimeoutException):
+        with pool.driver() as slow:
+            raise TimeoutException("page load timed out")
+    with pytest.raises(InvalidSessionIdException):
+        with pool.driver() as driver:
+            raise InvalidSessionIdException("invalid session id")
+    with pool.driver() as replacement:
+        pass
+
+    assert driver is slow and replacement is not slow
+    slow.quit.assert_called_once()
+    assert pool.stats()["crashed"] == 1
+
+
+def test_pool_size_bounds_open_drivers(factory):
+    pool = DriverPool(size=2, max_pages=100, factory=factory)
+    inside = threading.Semaphore(0)
+    proceed = threading.Event()
+    active, max_active = [0], [0]
+    lock = threading.Lock()
+
+    def browse():
+        with pool.driver():
+            with lock:
+                active[0] += 1
+                max_active[0] = max(max_active[0], active[0])
+            inside.release()
+            proceed.wait()
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=browse) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    inside.acquire()
+    inside.acquire()
+    assert pool.stats()["in_use"] == 2
+    proceed.set()
+    for thread in threads:
+        thread.join()
+
+    assert max_active[0] == 2
+    assert factory.call_count == 2
+    pool.close()
+    assert pool.stats()["idle"] == 0